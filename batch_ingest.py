@@ -0,0 +1,165 @@
+"""
+Ingestão em lote de currículos, sem a interface do Streamlit.
+
+Exemplos:
+    python batch_ingest.py docs
+    python batch_ingest.py /caminho/curriculos --max-in-flight 16 --jsonl resultados.jsonl
+
+Os currículos já presentes no destino são ignorados (no banco, reconhecidos
+pelo conteúdo, não pelo nome), então uma execução interrompida pode ser
+retomada rodando o mesmo comando novamente.
+"""
+import argparse
+import json
+import os
+import sys
+
+from cache_utils import sha256_file
+from dedup_utils import DuplicateIndex
+from ingestion_utils import ingest_resumes, MAX_IN_FLIGHT
+from metrics_utils import metrics
+from ocr_utils import get_ocr_backend
+from semantic_utils import backfill_embeddings
+from store_utils import ResumeStore, sync_duplicate_index
+
+
+def find_pdfs(directory):
+    """
+    Percorre um diretório (recursivamente) em busca de PDFs.
+
+    Args:
+    directory (str): Diretório de origem.
+
+    Returns:
+    list: Tuplas (nome do arquivo relativo ao diretório, caminho do PDF), ordenadas.
+    """
+    files = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.lower().endswith(".pdf"):
+                path = os.path.join(root, name)
+                files.append((os.path.relpath(path, directory).replace(os.sep, "/"), path))
+    return sorted(files)
+
+
+def load_checkpoint(jsonl_path):
+    """
+    Lê os nomes dos arquivos já gravados em uma saída JSONL.
+
+    Args:
+    jsonl_path (str): Caminho do arquivo JSONL.
+
+    Returns:
+    set: Nomes dos arquivos já processados.
+    """
+    done = set()
+    if os.path.exists(jsonl_path):
+        with open(jsonl_path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    done.add(json.loads(line)["filename"])
+                except (ValueError, KeyError):
+                    # Linha incompleta de uma execução interrompida
+                    continue
+    return done
+
+
+def plan_store_ingestion(store, files):
+    """
+    Separa os PDFs a processar no banco de currículos, reconhecendo pelo conteúdo
+    os já enviados: o banco é compartilhado com a interface, onde arquivos
+    diferentes podem ter o mesmo nome.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    files (list): Tuplas (nome do arquivo, caminho do PDF).
+
+    Returns:
+    tuple: Quantidade de PDFs já processados e lista de tuplas (nome no banco,
+    caminho do PDF) a processar, incluindo os envios anteriores ainda incompletos.
+    """
+    done, pending, names = 0, [], set()
+    for filename, path in files:
+        existing = store.find_sha256(sha256_file(path))
+        if existing is None:
+            # Nome livre no banco e entre os demais arquivos desta execução
+            name = store.unique_filename(filename, reserved=names)
+        elif store.stage_state(existing):
+            name = existing
+        else:
+            done += 1
+            continue
+        names.add(name)
+        pending.append((name, path))
+    return done, pending
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Processa em lote os currículos PDF de um diretório.")
+    parser.add_argument("directory", nargs="?", default="docs", help="Diretório com os PDFs (padrão: docs)")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT,
+                        help=f"Currículos processados simultaneamente (padrão: {MAX_IN_FLIGHT})")
+    parser.add_argument("--jsonl", help="Grava os resultados neste arquivo JSONL em vez do banco de currículos")
+    parser.add_argument("--backfill-embeddings", action="store_true",
+                        help="Calcula os embeddings dos currículos do banco que ainda não os têm e encerra")
+    parser.add_argument("--metrics", help="Grava as métricas da execução neste arquivo (JSON se terminar em .json, "
+                                          "senão no formato de texto do Prometheus)")
+    args = parser.parse_args(argv)
+
+    if args.backfill_embeddings:
+        print(f"{backfill_embeddings(ResumeStore())} embeddings calculados.")
+        return 0
+
+    files = find_pdfs(args.directory)
+    duplicates = DuplicateIndex()
+    if args.jsonl:
+        checkpoint = load_checkpoint(args.jsonl)
+        output = open(args.jsonl, "a", encoding="utf-8")
+        store = None
+        pending = [(filename, path) for filename, path in files if filename not in checkpoint]
+        done = len(checkpoint)
+    else:
+        store = ResumeStore()
+        done, pending = plan_store_ingestion(store, files)
+        sync_duplicate_index(store, duplicates)
+        output = None
+
+    print(f"{len(files)} PDFs encontrados, {done} já processados, {len(pending)} pendentes.")
+
+    failures = 0
+    results = ingest_resumes(pending, max_in_flight=args.max_in_flight, ocr_backend=get_ocr_backend(len(pending)),
+                             duplicates=duplicates, store=store)
+    try:
+        for i, (filename, result, error) in enumerate(results, start=1):
+            if error is not None:
+                failures += 1
+                print(f"[{i}/{len(pending)}] ERRO {filename}: {error}", file=sys.stderr)
+                continue
+            if output is not None:
+                record = dict(result)
+                if record.get("embedding") is not None:
+                    record["embedding_model"], vector = record.pop("embedding")
+                    record["embedding"] = vector.tolist()
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+            elif result.get("duplicate_of"):
+                store.add_duplicate(result)
+            else:
+                store.add(result)
+            if result.get("duplicate_of"):
+                print(f"[{i}/{len(pending)}] {filename}: duplicata de {result['duplicate_of']} ({result['reason']})")
+            else:
+                print(f"[{i}/{len(pending)}] {filename}")
+    finally:
+        if output is not None:
+            output.close()
+        if args.metrics:
+            with open(args.metrics, "w", encoding="utf-8") as metrics_file:
+                metrics_file.write(metrics.to_json() if args.metrics.endswith(".json") else metrics.to_prometheus())
+
+    print(f"Concluído: {len(pending) - failures} processados, {failures} com erro.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Vazão da ingestão com o Document AI e o Vertex AI simulados localmente.
+
+Os PDFs de docs/ são replicados até a quantidade pedida (cada cópia com um
+SHA-256 diferente, para não cair no cache de documentos) e processados por
+`ingestion_utils.ingest_resumes`. Uma fração dos arquivos pode ser tratada
+como digitalizada, forçando a passagem pelo OCR simulado. As chamadas seguem
+os limites de requisições configurados (`VERTEX_LLM_RATE_LIMIT` etc.).
+Com `--batch`, o OCR usa o backend em lote (`ocr_utils.BatchOcrBackend`)
+sobre o Cloud Storage e o processamento em lote simulados. Ao final, o texto
+de cada página retornado pelo lote é comparado ao do OCR síncrono; com 11 ou
+mais arquivos, a comparação cobre saídas cujos prefixos se sobrepõem
+(".../output/1" e ".../output/10"). Divergências encerram com código 1.
+
+Uso:
+    python benchmarks/bench_ingestion.py --files 100 --max-in-flight 8
+    python benchmarks/bench_ingestion.py --files 200 --scanned 0.3 --error-rate 0.05 --json ingestao.json
+    python benchmarks/bench_ingestion.py --files 100 --scanned 0.3 --batch
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from corpus import prepare_workdir, synthetic_pdfs
+from fake_gcp import FakeServices, install
+
+
+def batch_divergences(backend, file_paths):
+    # Páginas de cada documento no lote x OCR síncrono do mesmo PDF (sem passar pelo cache)
+    from gcp_utils import ocr_pages
+
+    results = backend._run_batch(file_paths)
+    divergent = []
+    for file_path in file_paths:
+        with open(file_path, "rb") as file:
+            expected = ocr_pages(file.read())
+        if results[file_path] != expected:
+            divergent.append(os.path.basename(file_path))
+    return divergent
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=50, help="Quantidade de PDFs (padrão: 50)")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="Currículos processados simultaneamente")
+    parser.add_argument("--ocr-latency", type=float, default=0.5, help="Latência do Document AI em segundos")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Latência do modelo de linguagem em segundos")
+    parser.add_argument("--embedding-latency", type=float, default=0.2, help="Latência dos embeddings em segundos")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Desvio aleatório máximo somado às latências")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração das chamadas que falham (429/503)")
+    parser.add_argument("--scanned", type=float, default=0.0, help="Fração dos PDFs tratados como digitalizados")
+    parser.add_argument("--retry-backoff", type=float, default=0.1, help="Espera base entre novas tentativas")
+    parser.add_argument("--batch", action="store_true", help="Usa o OCR em lote do Document AI")
+    parser.add_argument("--dedup", action="store_true", help="Ativa a verificação de duplicatas")
+    parser.add_argument("--seed", type=int, default=0, help="Semente da latência, dos erros e dos digitalizados")
+    parser.add_argument("--json", help="Grava o resultado neste arquivo JSON")
+    args = parser.parse_args(argv)
+
+    workdir = prepare_workdir()
+    os.environ["INGESTION_RETRY_BACKOFF"] = str(args.retry_backoff)
+    os.environ["SCHEDULER_BACKOFF"] = str(args.retry_backoff)
+    services = install(FakeServices(args.ocr_latency, args.llm_latency, args.embedding_latency,
+                                    args.jitter, args.error_rate, args.seed))
+
+    import gcp_utils
+    import ocr_utils
+    import pdf_utils
+    from cache_utils import sha256_file
+    from dedup_utils import DuplicateIndex
+    from ingestion_utils import ingest_resumes
+    from metrics_utils import metrics
+    from ui_utils import stage_summary
+
+    files = synthetic_pdfs(args.files, os.path.join(workdir, "pdfs"))
+    rng = random.Random(args.seed)
+    scanned = {sha256_file(path) for _, path in files if rng.random() < args.scanned}
+    if scanned:
+        text_layer = gcp_utils.extract_text_layer
+
+        def extract_text_layer(content):
+            # PDFs sorteados como digitalizados perdem a camada de texto e vão para o OCR
+            pages = text_layer(content)
+            if pages is not None and gcp_utils.sha256_bytes(content) in scanned:
+                return [""] * len(pages)
+            return pages
+        for module in (pdf_utils, gcp_utils, ocr_utils):
+            module.extract_text_layer = extract_text_layer
+
+    duplicates = DuplicateIndex() if args.dedup else None
+    ocr_backend = ocr_utils.BatchOcrBackend(bucket="benchmark", poll_interval=0) if args.batch else None
+    processed = failed = linked = 0
+    start = time.perf_counter()
+    for _, result, error in ingest_resumes(files, max_in_flight=args.max_in_flight, ocr_backend=ocr_backend,
+                                            duplicates=duplicates):
+        if error is not None:
+            failed += 1
+        elif result.get("duplicate_of"):
+            linked += 1
+        else:
+            processed += 1
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "arquivos": len(files),
+        "digitalizados": len(scanned),
+        "ocr_em_lote": args.batch,
+        "processados": processed,
+        "duplicatas": linked,
+        "falhas": failed,
+        "segundos": round(elapsed, 3),
+        "curriculos_por_segundo": round(len(files) / elapsed, 3),
+        "servicos": services.summary(),
+    }
+    divergent = []
+    if args.batch:
+        # Os arquivos do lote devem ter sido removidos do bucket ao final
+        report["objetos_no_bucket"] = len(services.storage)
+        divergent = batch_divergences(ocr_backend, [path for _, path in files])
+        report["lote_divergente_do_online"] = divergent
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    print()
+    print(stage_summary(metrics.snapshot()).to_string(index=False))
+    if args.json:
+        report["metricas"] = metrics.snapshot()
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+    if divergent:
+        raise SystemExit(f"{len(divergent)} documentos com texto do lote diferente do OCR síncrono")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Escalonador de chamadas remotas sob cota: latência das consultas interativas
+durante uma ingestão em lote e recusas (429) do serviço simulado.
+
+Uma ingestão em lote roda em segundo plano enquanto descrições de vaga são
+enviadas ao modelo de linguagem em intervalos fixos, como faria a interface.
+O serviço falso recusa com 429 as chamadas acima da cota por minuto; o
+escalonador (`scheduler_utils`) deve manter o ritmo abaixo dela e atender
+as consultas interativas antes das chamadas do lote. Com `--no-priority` as
+consultas vão para a mesma fila do lote, para comparação.
+
+Uso:
+    python benchmarks/bench_scheduler.py --files 40 --queries 10
+    python benchmarks/bench_scheduler.py --files 40 --llm-quota 60 --llm-rate-limit 90 --no-priority
+"""
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+
+from corpus import prepare_workdir, synthetic_pdfs
+from fake_gcp import FakeServices, install
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=40, help="Quantidade de PDFs do lote (padrão: 40)")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="Currículos processados simultaneamente")
+    parser.add_argument("--queries", type=int, default=10, help="Consultas interativas durante o lote")
+    parser.add_argument("--query-interval", type=float, default=1.0, help="Intervalo entre as consultas (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Latência do modelo de linguagem em segundos")
+    parser.add_argument("--llm-quota", type=int, default=120, help="Cota do modelo simulado (requisições/minuto)")
+    parser.add_argument("--llm-rate-limit", type=float, default=120,
+                        help="Ritmo configurado no escalonador (requisições/minuto)")
+    parser.add_argument("--backoff", type=float, default=0.5, help="Espera base do escalonador após um 429")
+    parser.add_argument("--no-priority", action="store_true", help="Envia as consultas na fila do lote")
+    parser.add_argument("--seed", type=int, default=0, help="Semente das latências")
+    parser.add_argument("--json", help="Grava o resultado neste arquivo JSON")
+    args = parser.parse_args(argv)
+
+    workdir = prepare_workdir()
+    # Lidas na importação de scheduler_utils
+    os.environ["VERTEX_LLM_RATE_LIMIT"] = str(args.llm_rate_limit)
+    os.environ["SCHEDULER_BACKOFF"] = str(args.backoff)
+    os.environ["INGESTION_RETRY_BACKOFF"] = str(args.backoff)
+    services = install(FakeServices(llm_latency=args.llm_latency, embedding_latency=0.05, seed=args.seed,
+                                    quotas={"vertex_llm": args.llm_quota}))
+
+    from gcp_utils import extract_keywords_from_description
+    from ingestion_utils import ingest_resumes
+    from metrics_utils import metrics
+    from scheduler_utils import BULK, INTERACTIVE, priority_lane, schedulers
+
+    files = synthetic_pdfs(args.files, os.path.join(workdir, "pdfs"))
+    outcome = {"processados": 0, "falhas": 0}
+
+    def bulk():
+        for _, _, error in ingest_resumes(files, max_in_flight=args.max_in_flight):
+            outcome["falhas" if error is not None else "processados"] += 1
+
+    start = time.perf_counter()
+    worker = threading.Thread(target=bulk)
+    worker.start()
+
+    latencies, failures = [], 0
+    with priority_lane(BULK if args.no_priority else INTERACTIVE):
+        for number in range(args.queries):
+            time.sleep(args.query_interval)
+            # Descrições distintas, para não cair no cache de respostas
+            description = f"Vaga {number}: desenvolvedor python com experiência em sql, docker e aws."
+            query_start = time.perf_counter()
+            try:
+                extract_keywords_from_description(description)
+            except Exception:
+                failures += 1
+            latencies.append((time.perf_counter() - query_start) * 1000)
+    worker.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    throttled = sum(counter["value"] for counter in metrics.snapshot()["counters"]
+                    if counter["name"] == "scheduler_throttled_total")
+    report = {
+        "arquivos": len(files),
+        "lote": dict(outcome, segundos=round(elapsed, 3),
+                     curriculos_por_segundo=round(len(files) / elapsed, 3)),
+        "consultas": {
+            "fila": "lote" if args.no_priority else "interativa",
+            "quantidade": len(latencies),
+            "falhas": failures,
+            "p50_ms": round(statistics.median(latencies), 1) if latencies else None,
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 1) if latencies else None,
+            "max_ms": round(latencies[-1], 1) if latencies else None,
+        },
+        "servicos": services.summary(),
+        "recusas_tratadas": throttled,
+        "escalonadores": [scheduler.status() for scheduler in schedulers.values()],
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
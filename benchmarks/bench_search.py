@@ -0,0 +1,99 @@
+"""
+Latência da busca, da triagem, do ranking semântico e dos filtros do banco
+de currículos em função do tamanho do banco.
+
+Para cada tamanho, um banco sintético é gerado a partir dos currículos de
+docs/ e as consultas são repetidas sobre os mesmos índices usados pela
+interface (`KeywordIndex`, `SemanticIndex`, `score_resumes` e as facetas
+de `ResumeStore`).
+
+Uso:
+    python benchmarks/bench_search.py --sizes 100 1000 5000 --repeat 20
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from corpus import prepare_workdir, synthetic_bank
+from fake_gcp import install
+
+# Consultas medidas: nome -> argumentos de score_resumes (além do banco e do índice)
+QUERIES = {
+    "busca": {"keywords": ["python", "sql", "power bi"]},
+    "busca_ponderada": {"keywords": ["python", "sql", "aws"], "weights": {"python": 3.0}, "required": ["sql"]},
+    "triagem": {"keywords": ["java", "docker", "kubernetes", "linux"], "min_years": 5.0},
+    "analise_vaga": {"keywords": ["python", "pandas", "spark", "etl", "machine learning"], "include_unmatched": True},
+}
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {"p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 3)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000], help="Tamanhos do banco")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetições de cada consulta")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do banco sintético")
+    parser.add_argument("--json", help="Grava o resultado neste arquivo JSON")
+    args = parser.parse_args(argv)
+
+    workdir = prepare_workdir()
+    install()
+
+    import numpy as np
+    from index_utils import KeywordIndex
+    from scoring_utils import score_resumes
+    from semantic_utils import SemanticIndex
+    from store_utils import ResumeStore, sync_index
+
+    rng = np.random.default_rng(args.seed)
+    report = []
+    for size in args.sizes:
+        store = ResumeStore(os.path.join(workdir, f"banco-{size}.sqlite3"))
+        synthetic_bank(store, size, seed=args.seed)
+
+        index = KeywordIndex()
+        start = time.perf_counter()
+        sync_index(store, index)
+        row = {"curriculos": size, "indexacao_s": round(time.perf_counter() - start, 3)}
+
+        for name, query in QUERIES.items():
+            row[name] = measure(lambda: score_resumes(store, index, **query), args.repeat)
+            row[f"{name}_top10"] = measure(lambda: score_resumes(store, index, top_k=10, **query), args.repeat)
+
+        semantic_index = SemanticIndex()
+        for filename in store.filenames():
+            semantic_index.add(filename, rng.standard_normal(768).astype(np.float32))
+        query_vector = rng.standard_normal(768).astype(np.float32)
+        row["semantico"] = measure(lambda: semantic_index.rank(query_vector), args.repeat)
+
+        # Aba do banco de currículos: facetas e uma página filtrada por habilidades e experiência
+        row["facetas"] = measure(lambda: (store.skill_facets(), store.experience_facets()), args.repeat)
+        row["banco_filtrado"] = measure(lambda: (
+            store.count_profiles(["Python", "SQL"], 5),
+            store.search_profiles(["Python", "SQL"], 5, "mais_experiencia", limit=10),
+        ), args.repeat)
+        report.append(row)
+
+        print(f"{size} currículos (indexação: {row['indexacao_s']} s)")
+        for name, value in row.items():
+            if isinstance(value, dict):
+                print(f"  {name:<24} p50 {value['p50_ms']:9.3f} ms   p95 {value['p95_ms']:9.3f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
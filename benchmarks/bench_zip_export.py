@@ -0,0 +1,114 @@
+"""
+Tempo e memória da exportação ZIP dos currículos.
+
+Compara `export_utils.build_zip` (arquivo em disco, cópia em blocos) com a
+montagem do ZIP inteiro em memória, como era feito antes, e mede o
+reaproveitamento do arquivo quando a seleção não muda. A memória é o pico
+de alocações Python medido pelo tracemalloc.
+
+Também mede o botão de download (`ui_utils.zip_download_button`) em
+reexecuções do script do Streamlit: com o arquivo aberto passado como dado,
+o ZIP inteiro era lido a cada interação; com o dado adiado, ele só é lido
+no clique (`export_utils.read_zip`).
+
+Uso:
+    python benchmarks/bench_zip_export.py --files 200 --reruns 5
+"""
+import argparse
+import io
+import json
+import os
+import time
+import tracemalloc
+import zipfile
+
+from corpus import prepare_workdir, synthetic_pdfs
+
+
+def in_memory_zip(entries):
+    # Abordagem anterior: todos os PDFs lidos e compactados em um BytesIO
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for path, arcname in entries:
+            with open(path, "rb") as file:
+                zip_file.writestr(arcname, file.read())
+    return buffer.getvalue()
+
+
+def download_page(entries, deferred):
+    # Página mínima com o botão de download, executada pelo AppTest
+    import streamlit as st
+    from export_utils import build_zip
+    from ui_utils import zip_download_button
+
+    if deferred:
+        zip_download_button("Baixar", entries, "curriculos.zip", key="zip")
+    else:
+        # Abordagem anterior: arquivo aberto passado ao botão a cada execução
+        with open(build_zip(entries), "rb") as zip_file:
+            st.download_button("Baixar", data=zip_file, file_name="curriculos.zip", key="zip")
+
+
+def rerun_download_page(entries, deferred, reruns):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_function(download_page, args=(entries, deferred), default_timeout=60)
+    for _ in range(reruns):
+        app.run()
+        assert not app.exception, app.exception
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {"segundos": round(elapsed, 3), "pico_memoria_mb": round(peak / 1024 / 1024, 2)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200, help="Quantidade de PDFs no ZIP (padrão: 200)")
+    parser.add_argument("--reruns", type=int, default=5, help="Reexecuções da página com o botão de download (padrão: 5)")
+    parser.add_argument("--json", help="Grava o resultado neste arquivo JSON")
+    args = parser.parse_args(argv)
+
+    workdir = prepare_workdir()
+
+    from export_utils import build_zip, read_zip
+
+    files = synthetic_pdfs(args.files, os.path.join(workdir, "pdfs"))
+    entries = [(path, f"curriculos/{filename}") for filename, path in files]
+    input_mb = sum(os.path.getsize(path) for path, _ in entries) / 1024 / 1024
+
+    _, memory = measure(lambda: in_memory_zip(entries))
+    zip_path, disk = measure(lambda: build_zip(entries))
+    _, reused = measure(lambda: build_zip(entries))
+    _, open_file_reruns = measure(lambda: rerun_download_page(entries, False, args.reruns))
+    _, deferred_reruns = measure(lambda: rerun_download_page(entries, True, args.reruns))
+    _, click = measure(lambda: read_zip(entries))
+
+    report = {
+        "arquivos": len(entries),
+        "entrada_mb": round(input_mb, 2),
+        "zip_mb": round(os.path.getsize(zip_path) / 1024 / 1024, 2),
+        "em_memoria": memory,
+        "em_disco": disk,
+        "reaproveitado": reused,
+        "botao_download": {
+            "reexecucoes": args.reruns,
+            "arquivo_aberto": open_file_reruns,
+            "dado_adiado": deferred_reruns,
+            "clique": click,
+        },
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
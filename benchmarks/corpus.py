@@ -0,0 +1,118 @@
+"""
+Corpora dos benchmarks: os currículos de exemplo em docs/ e versões sintéticas
+ampliadas a partir deles, sempre geradas com semente fixa.
+"""
+import atexit
+import glob
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOCS_DIR = os.path.join(ROOT, "docs")
+
+
+def prepare_workdir(prefix="bench-"):
+    """
+    Cria um diretório temporário (removido ao final) para o banco de currículos
+    e os caches do benchmark e o configura nas variáveis de ambiente lidas
+    pelos módulos do projeto. Deve ser chamada antes de importá-los.
+
+    Args:
+    prefix (str): Prefixo do diretório temporário.
+
+    Returns:
+    str: Caminho do diretório criado.
+    """
+    workdir = tempfile.mkdtemp(prefix=prefix)
+    atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+    os.environ["ANALISE_DATA_DIR"] = os.path.join(workdir, "data")
+    os.environ["ANALISE_CACHE_DIR"] = os.path.join(workdir, "cache")
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    return workdir
+
+
+def sample_pdfs(directory=DOCS_DIR):
+    """
+    Returns:
+    list: Caminhos dos PDFs de exemplo, ordenados.
+    """
+    return sorted(glob.glob(os.path.join(directory, "*.pdf")))
+
+
+def load_texts(directory=DOCS_DIR):
+    """
+    Lê a camada de texto dos PDFs de exemplo.
+
+    Returns:
+    list: Tuplas (nome do arquivo, caminho do PDF, texto).
+    """
+    from pdf_utils import extract_text_layer
+
+    resumes = []
+    for path in sample_pdfs(directory):
+        with open(path, "rb") as file:
+            pages = extract_text_layer(file.read()) or []
+        resumes.append((os.path.basename(path), path, "\n".join(pages)))
+    return resumes
+
+
+def synthetic_pdfs(count, output_dir, directory=DOCS_DIR):
+    """
+    Gera `count` PDFs distintos a partir dos exemplos. Cada cópia recebe um
+    comentário PDF único após o %%EOF, o que muda seu SHA-256 (e, portanto,
+    evita o cache de documentos) sem alterar o texto.
+
+    Args:
+    count (int): Quantidade de PDFs.
+    output_dir (str): Diretório de saída.
+    directory (str): Diretório dos PDFs de exemplo.
+
+    Returns:
+    list: Tuplas (nome do arquivo, caminho do PDF).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    sources = sample_pdfs(directory)
+    files = []
+    for number in range(count):
+        source = sources[number % len(sources)]
+        filename = f"{number:06d} - {os.path.basename(source)}"
+        path = os.path.join(output_dir, filename)
+        with open(source, "rb") as file:
+            content = file.read()
+        with open(path, "wb") as file:
+            file.write(content + f"\n%benchmark-{number}\n".encode("ascii"))
+        files.append((filename, path))
+    return files
+
+
+def synthetic_bank(store, count, seed=0, directory=DOCS_DIR):
+    """
+    Preenche um banco de currículos com `count` registros derivados dos exemplos,
+    cada um com uma seleção aleatória de termos técnicos e tempo de experiência.
+
+    Args:
+    store (ResumeStore): Banco de currículos (vazio).
+    count (int): Quantidade de currículos.
+    seed (int): Semente do gerador aleatório.
+    directory (str): Diretório dos PDFs de exemplo.
+    """
+    from fake_gcp import VOCABULARY
+
+    rng = random.Random(seed)
+    resumes = load_texts(directory)
+    for number in range(count):
+        filename, path, text = resumes[number % len(resumes)]
+        terms = rng.sample(VOCABULARY, rng.randint(3, 10))
+        years = rng.randint(0, 25)
+        store.add({
+            "filename": f"{number:06d} - {filename}",
+            "path": path,
+            "text": f"{text}\nCompetências: {', '.join(terms)}\n",
+            "name": f"Candidato {number}",
+            "keywords": terms,
+            "experience": f"{years} anos",
+        })
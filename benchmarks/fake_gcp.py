@@ -0,0 +1,329 @@
+"""
+Substitutos locais e determinísticos do Document AI e do Vertex AI para os benchmarks.
+
+`install` registra em `sys.modules` versões falsas dos SDKs do Google usados
+pelo projeto (e credenciais vazias em `st.secrets`), então deve ser chamada
+antes de importar `gcp_utils` ou qualquer módulo que o importe. As respostas
+são derivadas do próprio conteúdo enviado, com latência fixa (mais um
+desvio opcional) e erros injetados a partir de um gerador com semente fixa.
+Cada serviço pode ter uma cota de requisições por minuto: acima dela, as
+chamadas são recusadas com 429, como no GCP.
+
+O processamento em lote do Document AI também é simulado: o Cloud Storage é
+um dicionário em memória (`FakeServices.storage`) e `batch_process_documents`
+processa os PDFs do bucket na hora, gravando a saída de cada documento em
+JSON e retornando uma operação já concluída.
+"""
+import collections
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+import types
+
+# Termos técnicos reconhecidos pelo LLM falso
+VOCABULARY = (
+    "python", "sql", "power bi", "excel", "java", "javascript", "react", "node.js", "c#", ".net", "aws", "azure",
+    "gcp", "docker", "kubernetes", "linux", "git", "scrum", "pandas", "spark", "etl", "tableau", "sap", "oracle",
+    "mysql", "postgresql", "mongodb", "api", "rest", "machine learning", "php", "html", "css", "angular", "jira",
+)
+
+
+class FakeServiceError(Exception):
+    """
+    Erro injetado por um serviço falso, com o código HTTP correspondente (429 ou 503).
+    """
+
+    def __init__(self, service, code):
+        super().__init__(f"{service}: erro simulado {code}")
+        self.service = service
+        self.code = code
+
+
+class FakeService:
+    """
+    Latência, cota por minuto e injeção de erros de um serviço falso, com contagem das chamadas.
+    """
+
+    def __init__(self, name, latency, jitter, error_rate, seed, quota=None):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.quota = quota
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+        self._accepted = collections.deque()
+        self._random = random.Random(f"{name}:{seed}")
+        self._lock = threading.Lock()
+
+    def call(self):
+        with self._lock:
+            self.calls += 1
+            if self.quota is not None:
+                # Janela deslizante de 60 s com as chamadas aceitas
+                now = time.monotonic()
+                while self._accepted and now - self._accepted[0] >= 60:
+                    self._accepted.popleft()
+                if len(self._accepted) >= self.quota:
+                    self.rejected += 1
+                    raise FakeServiceError(self.name, 429)
+                self._accepted.append(now)
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failure = self._random.random() < self.error_rate
+            code = self._random.choice((429, 503))
+            if failure:
+                self.errors += 1
+        time.sleep(delay)
+        if failure:
+            raise FakeServiceError(self.name, code)
+
+
+class FakeServices:
+    """
+    Conjunto dos serviços falsos instalados por `install`. Uma requisição de
+    lote conta como uma única chamada ao Document AI.
+    """
+
+    def __init__(self, ocr_latency=0.5, llm_latency=1.0, embedding_latency=0.2, jitter=0.0, error_rate=0.0, seed=0,
+                 quotas=None):
+        quotas = quotas or {}
+        self.documentai = FakeService("documentai", ocr_latency, jitter, error_rate, seed, quotas.get("documentai"))
+        self.llm = FakeService("vertex_llm", llm_latency, jitter, error_rate, seed, quotas.get("vertex_llm"))
+        self.embedding = FakeService("vertex_embedding", embedding_latency, jitter, error_rate, seed,
+                                     quotas.get("vertex_embedding"))
+        # Objetos do Cloud Storage falso: (bucket, nome) -> conteúdo
+        self.storage = {}
+        self.storage_lock = threading.Lock()
+
+    def summary(self):
+        """
+        Returns:
+        dict: Serviço -> chamadas, erros injetados e chamadas recusadas pela cota.
+        """
+        return {
+            service.name: {"chamadas": service.calls, "erros": service.errors, "acima_da_cota": service.rejected}
+            for service in (self.documentai, self.llm, self.embedding)
+        }
+
+
+def _document(text, page_numbers):
+    # Documento no formato lido por gcp_utils.document_page_text: um parágrafo por página
+    pages = []
+    per_page = max(1, len(text) // max(1, len(page_numbers)))
+    for position, number in enumerate(page_numbers):
+        start = position * per_page
+        end = len(text) if position == len(page_numbers) - 1 else start + per_page
+        segment = types.SimpleNamespace(start_index=start, end_index=end)
+        layout = types.SimpleNamespace(text_anchor=types.SimpleNamespace(text_segments=[segment]))
+        pages.append(types.SimpleNamespace(page_number=number, paragraphs=[types.SimpleNamespace(layout=layout)]))
+    return types.SimpleNamespace(text=text, pages=pages)
+
+
+def _document_json(text, page_numbers):
+    # Saída de um documento do lote no formato JSON do Document AI (campos em camelCase)
+    document = _document(text, page_numbers)
+    return json.dumps({"text": document.text, "pages": [
+        {"pageNumber": page.page_number, "paragraphs": [{"layout": {"textAnchor": {"textSegments": [
+            {"startIndex": segment.start_index, "endIndex": segment.end_index}
+            for segment in paragraph.layout.text_anchor.text_segments
+        ]}}} for paragraph in page.paragraphs]}
+        for page in document.pages
+    ]}).encode("utf-8")
+
+
+def _namespace(value):
+    # JSON em camelCase -> objetos com atributos em snake_case, como as mensagens do SDK
+    if isinstance(value, dict):
+        return types.SimpleNamespace(**{re.sub(r"(?<!^)([A-Z])", r"_\1", key).lower(): _namespace(item)
+                                        for key, item in value.items()})
+    if isinstance(value, list):
+        return [_namespace(item) for item in value]
+    return value
+
+
+class FakeDocument:
+    @staticmethod
+    def from_json(payload, ignore_unknown_fields=False):
+        return _namespace(json.loads(payload))
+
+
+def _found_terms(text):
+    lowered = text.lower()
+    return [term for term in VOCABULARY if re.search(rf"(?<![\w.#+]){re.escape(term)}(?![\w#+])", lowered)]
+
+
+def _answer(prompt):
+    # Resposta determinística derivada do texto enviado, no formato que cada pergunta espera
+    description, _, question = prompt.rpartition("\nQ: ")
+    digest = int(hashlib.sha256(description.encode("utf-8")).hexdigest(), 16)
+    terms = _found_terms(description) or ["python"]
+    if "JSON" in question:
+        first_line = next((line.strip() for line in description.splitlines() if line.strip()), "Candidato")
+        return json.dumps({"nome": first_line[:60], "palavras_chave": terms, "tempo_experiencia": str(digest % 25)},
+                          ensure_ascii=False)
+    if "nome completo" in question:
+        return next((line.strip() for line in description.splitlines() if line.strip()), "Candidato")
+    if "experiência" in question:
+        return str(digest % 25)
+    return ", ".join(terms)
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+
+def install(services=None):
+    """
+    Instala os SDKs falsos do Google em `sys.modules`.
+
+    Args:
+    services (FakeServices): Serviços falsos (padrão: latências padrão, sem erros).
+
+    Returns:
+    FakeServices: Serviços instalados, com os contadores de chamadas.
+    """
+    services = services or FakeServices()
+
+    from pdf_utils import extract_text_layer
+
+    def read_pages(content, page_numbers=None):
+        pages = extract_text_layer(content) or [""]
+        page_numbers = page_numbers or list(range(1, len(pages) + 1))
+        return "\n".join(pages[number - 1] for number in page_numbers if number <= len(pages)), page_numbers
+
+    class Blob:
+        def __init__(self, bucket_name, name):
+            self.bucket_name = bucket_name
+            self.name = name
+
+        def upload_from_filename(self, filename, content_type=None):
+            with open(filename, "rb") as file:
+                content = file.read()
+            with services.storage_lock:
+                services.storage[self.bucket_name, self.name] = content
+
+        def download_as_bytes(self):
+            with services.storage_lock:
+                return services.storage[self.bucket_name, self.name]
+
+        def delete(self):
+            with services.storage_lock:
+                del services.storage[self.bucket_name, self.name]
+
+    def list_blobs(bucket_name, prefix=""):
+        with services.storage_lock:
+            names = sorted(name for bucket, name in services.storage if bucket == bucket_name and name.startswith(prefix))
+        return [Blob(bucket_name, name) for name in names]
+
+    class Bucket:
+        def __init__(self, name):
+            self.name = name
+
+        def blob(self, name):
+            return Blob(self.name, name)
+
+        def list_blobs(self, prefix=""):
+            return list_blobs(self.name, prefix)
+
+    class StorageClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def bucket(self, name):
+            return Bucket(name)
+
+        def list_blobs(self, bucket_name, prefix=""):
+            return list_blobs(bucket_name, prefix)
+
+    def split_uri(uri):
+        bucket_name, _, name = uri[len("gs://"):].partition("/")
+        return bucket_name, name
+
+    class DocumentProcessorServiceClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def process_document(self, request):
+            services.documentai.call()
+            selector = request.get("process_options", {}).get("individual_page_selector", {})
+            text, page_numbers = read_pages(request["raw_document"]["content"], selector.get("pages"))
+            return types.SimpleNamespace(document=_document(text, page_numbers))
+
+        def batch_process_documents(self, request):
+            # A operação é concluída na própria chamada; cada PDF gera um JSON em output/<n>/
+            services.documentai.call()
+            output = request["document_output_config"]["gcs_output_config"]["gcs_uri"]
+            statuses = []
+            for number, document in enumerate(request["input_documents"]["gcs_documents"]["documents"]):
+                destination = f"{output}{number}"
+                bucket_name, name = split_uri(destination)
+                try:
+                    content = Blob(*split_uri(document["gcs_uri"])).download_as_bytes()
+                except KeyError:
+                    status = types.SimpleNamespace(code=5, message=f"{document['gcs_uri']} não encontrado")
+                else:
+                    with services.storage_lock:
+                        services.storage[bucket_name, f"{name}/0/documento-0.json"] = _document_json(*read_pages(content))
+                    status = types.SimpleNamespace(code=0, message="")
+                statuses.append(types.SimpleNamespace(input_gcs_source=document["gcs_uri"], status=status,
+                                                      output_gcs_destination=destination))
+            metadata = types.SimpleNamespace(individual_process_statuses=statuses)
+            return types.SimpleNamespace(done=lambda: True, result=lambda: None, metadata=metadata)
+
+    class TextGenerationModel:
+        @classmethod
+        def from_pretrained(cls, name):
+            return cls()
+
+        def predict(self, prompt, **parameters):
+            services.llm.call()
+            return types.SimpleNamespace(text=_answer(prompt), raw_prediction_response=None)
+
+    class TextEmbeddingModel:
+        dimensions = 64
+
+        @classmethod
+        def from_pretrained(cls, name):
+            return cls()
+
+        def get_embeddings(self, texts):
+            services.embedding.call()
+            embeddings = []
+            for text in texts:
+                vector = [0.0] * self.dimensions
+                for term in _found_terms(text):
+                    vector[int(hashlib.md5(term.encode("utf-8")).hexdigest(), 16) % self.dimensions] += 1.0
+                embeddings.append(types.SimpleNamespace(values=vector))
+            return embeddings
+
+    class Credentials:
+        @classmethod
+        def from_service_account_info(cls, info):
+            return cls()
+
+    # O Streamlit depende do pacote google.protobuf, então o namespace "google" real é preservado
+    import streamlit as st
+    st.secrets = {"GOOGLE_APPLICATION_CREDENTIALS": "{}"}
+    try:
+        import google
+    except ImportError:
+        google = _module("google", __path__=[])
+
+    documentai = _module("google.cloud.documentai_v1", DocumentProcessorServiceClient=DocumentProcessorServiceClient,
+                         Document=FakeDocument)
+    storage = _module("google.cloud.storage", Client=StorageClient)
+    google.cloud = _module("google.cloud", __path__=[], documentai_v1=documentai, storage=storage)
+    service_account = _module("google.oauth2.service_account", Credentials=Credentials)
+    google.oauth2 = _module("google.oauth2", __path__=[], service_account=service_account)
+    language_models = _module("vertexai.language_models", TextGenerationModel=TextGenerationModel,
+                              TextEmbeddingModel=TextEmbeddingModel)
+    _module("vertexai", __path__=[], init=lambda **kwargs: None, language_models=language_models)
+    return services
@@ -0,0 +1,198 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Diretório compartilhado entre sessões e processos para os caches em disco
+CACHE_DIR = os.environ.get("ANALISE_CACHE_DIR", ".cache")
+DOCUMENT_CACHE_PATH = os.path.join(CACHE_DIR, "documentai.sqlite3")
+DOCUMENT_CACHE_MAX_BYTES = int(os.environ.get("DOCUMENT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+_MISSING = object()
+
+
+def sha256_bytes(content):
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo.
+
+    Args:
+    content (bytes): Conteúdo binário do arquivo.
+
+    Returns:
+    str: Hash SHA-256 em hexadecimal.
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def sha256_file(path, chunk_size=1024 * 1024):
+    """
+    Calcula o hash SHA-256 de um arquivo em disco, lendo-o em blocos.
+
+    Args:
+    path (str): Caminho do arquivo.
+    chunk_size (int): Tamanho dos blocos lidos.
+
+    Returns:
+    str: Hash SHA-256 em hexadecimal.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DocumentCache:
+    """
+    Cache persistente dos textos extraídos pelo Document AI, endereçado pelo
+    SHA-256 do PDF. Usa SQLite para ser compartilhado entre sessões e processos
+    e remove as entradas menos usadas recentemente quando excede `max_bytes`.
+    """
+
+    def __init__(self, path=DOCUMENT_CACHE_PATH, max_bytes=DOCUMENT_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    sha256 TEXT NOT NULL,
+                    processor_id TEXT NOT NULL,
+                    processor_version TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (sha256, processor_id, processor_version)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_last_access ON documents (last_access)")
+
+    def _connect(self):
+        # Uma conexão por thread, pois conexões SQLite não devem ser compartilhadas entre threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, digest, processor_id, processor_version):
+        """
+        Busca o texto extraído de um documento no cache.
+
+        Args:
+        digest (str): SHA-256 do PDF.
+        processor_id (str): ID do processador do Document AI.
+        processor_version (str): Versão do processador.
+
+        Returns:
+        str or None: Texto extraído ou None se não estiver no cache.
+        """
+        conn = self._connect()
+        key = (digest, processor_id, processor_version)
+        row = conn.execute(
+            "SELECT text FROM documents WHERE sha256 = ? AND processor_id = ? AND processor_version = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute(
+                "UPDATE documents SET last_access = ? WHERE sha256 = ? AND processor_id = ? AND processor_version = ?",
+                (time.time(),) + key,
+            )
+        return row[0]
+
+    def put(self, digest, processor_id, processor_version, text):
+        """
+        Armazena o texto extraído de um documento e aplica a política LRU.
+
+        Args:
+        digest (str): SHA-256 do PDF.
+        processor_id (str): ID do processador do Document AI.
+        processor_version (str): Versão do processador.
+        text (str): Texto extraído do documento.
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, processor_id, processor_version, text, len(text.encode("utf-8")), time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM documents").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        stale = []
+        for rowid, size in conn.execute("SELECT rowid, size FROM documents ORDER BY last_access"):
+            stale.append((rowid,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM documents WHERE rowid = ?", stale)
+
+
+class TTLCache:
+    """
+    Cache em memória com tamanho máximo (LRU) e tempo de expiração por entrada.
+    Seguro para uso por várias threads.
+    """
+
+    def __init__(self, max_size=1024, ttl=3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Busca um valor no cache, descartando-o se já tiver expirado.
+
+        Args:
+        key (hashable): Chave da entrada.
+        default (object): Valor retornado quando a chave não está no cache.
+
+        Returns:
+        object: Valor armazenado ou `default`.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """
+        Armazena um valor no cache, removendo a entrada menos usada se necessário.
+
+        Args:
+        key (hashable): Chave da entrada.
+        value (object): Valor a ser armazenado.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove todas as entradas do cache.
+        """
+        with self._lock:
+            self._entries.clear()
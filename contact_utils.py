@@ -0,0 +1,126 @@
+import re
+import unicodedata
+
+EMAIL_LOCAL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+$")
+EMAIL_DOMAIN_PATTERN = re.compile(r"[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+# Links quebrados em duas linhas pelo PDF ("alvaro-\nroberto-123") são aceitos.
+LINKEDIN_SLUG_PATTERN = re.compile(r"[a-zA-Z0-9_%]+(?:-(?:[ \t]*\n[ \t]*)?[a-zA-Z0-9_%]+)*")
+PHONE_PATTERN = re.compile(r"(?<![\d/])(?:\+?55[\s.-]*)?\(?\d{2}\)?[\s.-]*(?:9[\s.-]?)?\d{4}[\s.-]?\d{4}(?![\d/])")
+# Padrão único, compilado uma vez, que localiza em uma só passada os pontos onde pode haver um
+# contato: o "@" de um email, o prefixo de um link do LinkedIn ou um telefone completo. Emails e
+# links são confirmados pelos padrões acima; telefones são casados inteiros, a partir do seu início,
+# para que números vizinhos (ou precedidos por outros dígitos, como datas) não se percam. O
+# lookahead descarta pelo primeiro caractere as posições que não podem iniciar um telefone.
+CONTACT_PATTERN = re.compile(r"@|[lL]inked[iI]n\.com/in/|(?=[+(\d])" + PHONE_PATTERN.pattern)
+# Maior parte local de email considerada antes do "@"
+EMAIL_LOCAL_MAX_CHARS = 64
+
+# Palavras que indicam cabeçalhos de seção, não nomes de pessoas
+NAME_STOPWORDS = {
+    "curriculo", "curriculum", "vitae", "resumo", "contato", "perfil", "objetivo", "experiencia",
+    "formacao", "academica", "profissional", "qualificacoes", "competencias", "principais", "idioma",
+    "idiomas", "dados", "pessoais", "cursos", "treinamentos", "habilidades", "analista", "engenheiro",
+    "desenvolvedor", "cientista", "consultor", "gerente", "suporte", "email", "telefone", "endereco",
+    "rua", "avenida", "av", "travessa", "bairro", "cidade", "estado", "brasil", "nacionalidade",
+}
+NAME_PARTICLES = {"da", "de", "do", "das", "dos", "e"}
+NAME_LABEL_PATTERN = re.compile(r"^\s*(?:nome(?: completo)?|candidato|profissional)\s*:\s*", re.IGNORECASE)
+NAME_WORD_PATTERN = re.compile(r"^(?:[^\W\d_][^\W\d_'’-]*(?:[-'’][^\W\d_]+)*|[^\W\d_]\.)$")
+# Quantidade de linhas não vazias do início do currículo consideradas para o nome
+NAME_SEARCH_LINES = 12
+# Abaixo desta confiança o nome é confirmado pelo modelo de linguagem
+NAME_CONFIDENCE_THRESHOLD = 0.8
+
+
+def _fold(text):
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def normalize_phone(raw):
+    """
+    Normaliza um telefone brasileiro para o formato E.164 (+55DDDNÚMERO).
+
+    Args:
+    raw (str): Telefone como aparece no texto.
+
+    Returns:
+    str or None: Telefone normalizado, ou None se não for um número válido.
+    """
+    digits = re.sub(r"\D", "", raw)
+    if len(digits) in (12, 13) and digits.startswith("55"):
+        digits = digits[2:]
+    if len(digits) not in (10, 11) or digits[0] == "0":
+        return None
+    return f"+55{digits}"
+
+
+def extract_contact_details(text):
+    """
+    Extrai telefones, emails e links do LinkedIn do texto em uma única passada.
+
+    Os valores são normalizados (telefones em E.164, emails em minúsculas e
+    links completos do LinkedIn) e retornados sem repetições, na ordem em que
+    aparecem.
+
+    Args:
+    text (str): Texto extraído do documento.
+
+    Returns:
+    tuple: Telefones, emails e links do LinkedIn.
+    """
+    phones, emails, linkedin_links = {}, {}, {}
+    for match in CONTACT_PATTERN.finditer(text):
+        start, end = match.span()
+        first = text[start]
+        if first == "@":
+            local = EMAIL_LOCAL_PATTERN.search(text, max(0, start - EMAIL_LOCAL_MAX_CHARS), start)
+            domain = EMAIL_DOMAIN_PATTERN.match(text, end)
+            if local and domain:
+                emails.setdefault(text[local.start():domain.end()].lower(), None)
+        elif first in "lL":
+            slug = LINKEDIN_SLUG_PATTERN.match(text, end)
+            if slug:
+                slug = re.sub(r"\s+", "", slug.group())
+                linkedin_links.setdefault(f"https://www.linkedin.com/in/{slug}", None)
+        else:
+            phone = normalize_phone(match.group())
+            if phone:
+                phones.setdefault(phone, None)
+    return list(phones), list(emails), list(linkedin_links)
+
+
+def guess_name(text):
+    """
+    Estima localmente o nome do candidato a partir das primeiras linhas do currículo.
+
+    Args:
+    text (str): Texto extraído do documento.
+
+    Returns:
+    tuple: Nome (ou None) e confiança da estimativa, entre 0 e 1.
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    for position, line in enumerate(lines[:NAME_SEARCH_LINES]):
+        labeled = NAME_LABEL_PATTERN.match(line) is not None
+        candidate = NAME_LABEL_PATTERN.sub("", line).strip()
+        words = candidate.split()
+        if not 2 <= len(words) <= 6 or not all(NAME_WORD_PATTERN.match(word) for word in words):
+            continue
+        folded = [_fold(word) for word in words]
+        if any(word.strip(".") in NAME_STOPWORDS for word in folded):
+            continue
+        significant = [word for word, fold in zip(words, folded) if fold not in NAME_PARTICLES]
+        if len(significant) < 2 or not all(word[0].isupper() for word in significant):
+            continue
+
+        confidence = 1.0 if position < 3 or labeled else 0.7
+        if any(word.endswith(".") for word in words):
+            # Sobrenome abreviado ("Lucas O.") indica nome incompleto
+            confidence -= 0.3
+        name = " ".join(
+            word.lower() if fold in NAME_PARTICLES else (word.title() if word.isupper() else word)
+            for word, fold in zip(words, folded)
+        )
+        return name, confidence
+    return None, 0.0
@@ -0,0 +1,189 @@
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from contact_utils import extract_contact_details
+from index_utils import tokenize
+from pdf_utils import pages_without_text
+
+# Quantidade de tokens consecutivos em cada shingle do MinHash
+SHINGLE_SIZE = 5
+# Assinatura MinHash: permutações divididas em faixas para o LSH (faixas x linhas)
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+# Similaridade de Jaccard estimada a partir da qual dois textos são tratados como o mesmo currículo
+DEDUP_SIMILARITY = float(os.environ.get("DEDUP_SIMILARITY", 0.8))
+
+# Primo de Mersenne usado no hash universal das permutações
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(1)
+_PERMUTATION_A = _rng.randint(1, (1 << 31) - 1, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+_PERMUTATION_B = _rng.randint(0, (1 << 31) - 1, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+
+
+def minhash_signature(text):
+    """
+    Calcula a assinatura MinHash dos shingles de tokens de um texto.
+
+    Args:
+    text (str): Texto extraído do currículo.
+
+    Returns:
+    np.ndarray or None: Assinatura (uint64), ou None se o texto for curto demais.
+    """
+    tokens = tokenize(text)
+    if len(tokens) < SHINGLE_SIZE:
+        return None
+    shingles = {" ".join(tokens[start:start + SHINGLE_SIZE]) for start in range(len(tokens) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+                         dtype=np.uint64, count=len(shingles))
+    permuted = (_PERMUTATION_A[:, None] * hashes[None, :] + _PERMUTATION_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1)
+
+
+def text_layer_fingerprint(pages):
+    """
+    Texto usado para detectar duplicatas de um PDF antes das etapas remotas.
+
+    Args:
+    pages (list or None): Camada de texto de cada página (ver `pdf_utils.read_pdf`).
+
+    Returns:
+    tuple: Texto da camada de texto (ou None) e se esse texto cobre todas as páginas.
+    """
+    if not pages:
+        return None, False
+    return "\n".join(pages), not pages_without_text(pages)
+
+
+class DuplicateIndex:
+    """
+    Índice de duplicatas dos currículos, consultado antes das etapas remotas da ingestão.
+
+    Um currículo é duplicata de outro quando tem o mesmo conteúdo (SHA-256),
+    compartilha um email ou telefone normalizado ou tem texto quase idêntico.
+    A última verificação usa MinHash com LSH, de modo que cada consulta só
+    compara o texto com os poucos currículos que caem nas mesmas faixas.
+    """
+
+    def __init__(self, similarity=DEDUP_SIMILARITY):
+        self.similarity = similarity
+        self._hashes = {}
+        self._contacts = {}
+        self._buckets = {}
+        self._signatures = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+        # Últimos registros do banco já indexados (ver store_utils.sync_duplicate_index)
+        self.synced_id = 0
+        self.synced_duplicate_id = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    @staticmethod
+    def _bands(signature):
+        rows = MINHASH_PERMUTATIONS // LSH_BANDS
+        return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(LSH_BANDS)]
+
+    def add(self, doc_id, sha256=None, text=None):
+        """
+        Registra um currículo (ou um novo SHA-256 de um currículo já registrado).
+
+        Args:
+        doc_id (str): Identificador do currículo.
+        sha256 (str): SHA-256 do PDF.
+        text (str): Texto extraído do currículo.
+        """
+        signature = minhash_signature(text) if text and doc_id not in self._signatures else None
+        contacts = extract_contact_details(text) if text else ((), (), ())
+        with self._lock:
+            self._add(doc_id, sha256, contacts, signature)
+
+    def _add(self, doc_id, sha256, contacts, signature):
+        keys = self._keys.setdefault(doc_id, set())
+        if sha256:
+            self._hashes.setdefault(sha256, doc_id)
+            keys.add(("hash", sha256))
+        phones, emails, _ = contacts
+        for contact in (*phones, *emails):
+            self._contacts.setdefault(contact, doc_id)
+            keys.add(("contact", contact))
+        if signature is not None and doc_id not in self._signatures:
+            self._signatures[doc_id] = signature
+            for band in self._bands(signature):
+                self._buckets.setdefault(band, set()).add(doc_id)
+
+    def remove(self, doc_id):
+        """
+        Remove um currículo do índice (por exemplo, quando seu processamento falha).
+
+        Args:
+        doc_id (str): Identificador do currículo.
+        """
+        with self._lock:
+            for kind, key in self._keys.pop(doc_id, ()):
+                table = self._hashes if kind == "hash" else self._contacts
+                if table.get(key) == doc_id:
+                    del table[key]
+            signature = self._signatures.pop(doc_id, None)
+            if signature is not None:
+                for band in self._bands(signature):
+                    bucket = self._buckets.get(band)
+                    if bucket is not None:
+                        bucket.discard(doc_id)
+                        if not bucket:
+                            del self._buckets[band]
+
+    def _find(self, sha256, contacts, signature):
+        if sha256 and sha256 in self._hashes:
+            return self._hashes[sha256], "conteúdo idêntico"
+        phones, emails, _ = contacts
+        for contact in emails:
+            if contact in self._contacts:
+                return self._contacts[contact], f"mesmo email ({contact})"
+        for contact in phones:
+            if contact in self._contacts:
+                return self._contacts[contact], f"mesmo telefone ({contact})"
+        if signature is not None:
+            candidates = set()
+            for band in self._bands(signature):
+                candidates |= self._buckets.get(band, set())
+            best = None
+            for candidate in candidates:
+                score = float(np.mean(self._signatures[candidate] == signature))
+                if score >= self.similarity and (best is None or score > best[1]):
+                    best = (candidate, score)
+            if best is not None:
+                return best[0], f"texto semelhante ({best[1]:.0%})"
+        return None
+
+    def match_or_add(self, doc_id, sha256=None, text=None, index_text=True):
+        """
+        Procura um currículo já registrado equivalente a este e, se não houver,
+        registra este currículo. A consulta e o registro são atômicos, então
+        duplicatas enviadas no mesmo lote também são detectadas.
+
+        Args:
+        doc_id (str): Identificador do currículo.
+        sha256 (str): SHA-256 do PDF.
+        text (str): Texto disponível do currículo.
+        index_text (bool): Se o texto deve ser registrado (False quando ele
+        ainda está incompleto, antes do OCR).
+
+        Returns:
+        tuple or None: Identificador do currículo original e motivo, ou None.
+        """
+        signature = minhash_signature(text) if text else None
+        contacts = extract_contact_details(text) if text else ((), (), ())
+        with self._lock:
+            match = self._find(sha256, contacts, signature)
+            if match is not None and match[0] != doc_id:
+                return match
+            if index_text:
+                self._add(doc_id, sha256, contacts, signature)
+            else:
+                self._add(doc_id, sha256, ((), (), ()), None)
+        return None
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import zipfile
+
+from cache_utils import CACHE_DIR
+from metrics_utils import record_cache, timed
+
+# Arquivos ZIP gerados ficam em disco e são reaproveitados enquanto a seleção não mudar
+EXPORT_DIR = os.path.join(CACHE_DIR, "exports")
+EXPORT_MAX_FILES = int(os.environ.get("EXPORT_MAX_FILES", 20))
+CHUNK_SIZE = 1024 * 1024
+
+
+def export_path(entries, extra_files=None, export_dir=EXPORT_DIR):
+    """
+    Calcula o caminho do ZIP correspondente a uma seleção de currículos.
+
+    A chave considera o nome de cada arquivo no ZIP, seu caminho, tamanho e data
+    de modificação, além do conteúdo dos arquivos extras.
+
+    Args:
+    entries (list): Tuplas (caminho do PDF, nome dentro do ZIP).
+    extra_files (dict): Nome dentro do ZIP -> conteúdo em texto.
+    export_dir (str): Diretório dos ZIPs gerados.
+
+    Returns:
+    str: Caminho do arquivo ZIP (que pode ainda não existir).
+    """
+    signature = []
+    for path, arcname in entries:
+        stat = os.stat(path)
+        signature.append([path, arcname, stat.st_size, stat.st_mtime_ns])
+    payload = json.dumps([signature, sorted((extra_files or {}).items())]).encode("utf-8")
+    return os.path.join(export_dir, f"{hashlib.sha256(payload).hexdigest()}.zip")
+
+
+def build_zip(entries, extra_files=None, export_dir=EXPORT_DIR):
+    """
+    Gera (ou reaproveita) um ZIP com os PDFs selecionados, copiando-os em blocos
+    para manter o uso de memória limitado. Os PDFs já são compactados, então são
+    armazenados sem recompressão.
+
+    Args:
+    entries (list): Tuplas (caminho do PDF, nome dentro do ZIP).
+    extra_files (dict): Nome dentro do ZIP -> conteúdo em texto.
+    export_dir (str): Diretório dos ZIPs gerados.
+
+    Returns:
+    str: Caminho do arquivo ZIP.
+    """
+    zip_path = export_path(entries, extra_files, export_dir)
+    reused = os.path.exists(zip_path)
+    record_cache("exportacao_zip", reused)
+    if reused:
+        os.utime(zip_path)
+        return zip_path
+
+    os.makedirs(export_dir, exist_ok=True)
+    temp_path = f"{zip_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with timed("exportacao_zip"):
+        with zipfile.ZipFile(temp_path, "w") as zip_file:
+            for path, arcname in entries:
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                info.compress_type = zipfile.ZIP_STORED
+                with open(path, "rb") as source, zip_file.open(info, "w") as target:
+                    shutil.copyfileobj(source, target, CHUNK_SIZE)
+            for arcname, content in (extra_files or {}).items():
+                zip_file.writestr(arcname, content, compress_type=zipfile.ZIP_DEFLATED)
+        os.replace(temp_path, zip_path)
+    _prune_exports(export_dir)
+    return zip_path
+
+
+def read_zip(entries, extra_files=None, export_dir=EXPORT_DIR):
+    """
+    Lê o conteúdo do ZIP de uma seleção, gerando-o de novo se tiver sido
+    descartado. Usado como dado adiado do botão de download, executado apenas
+    quando o usuário clica nele.
+
+    Args:
+    entries (list): Tuplas (caminho do PDF, nome dentro do ZIP).
+    extra_files (dict): Nome dentro do ZIP -> conteúdo em texto.
+    export_dir (str): Diretório dos ZIPs gerados.
+
+    Returns:
+    bytes: Conteúdo do arquivo ZIP.
+    """
+    with open(build_zip(entries, extra_files, export_dir), "rb") as zip_file:
+        return zip_file.read()
+
+
+def _prune_exports(export_dir):
+    # Mantém apenas os ZIPs usados mais recentemente
+    archives = [os.path.join(export_dir, name) for name in os.listdir(export_dir) if name.endswith(".zip")]
+    archives.sort(key=os.path.getmtime, reverse=True)
+    for stale in archives[EXPORT_MAX_FILES:]:
+        try:
+            os.remove(stale)
+        except FileNotFoundError:
+            pass
@@ -1,67 +1,279 @@
+import functools
 import json
+import os
+import threading
 import streamlit as st
-from google.cloud import documentai_v1 as documentai
-from google.oauth2 import service_account
-import vertexai
-from vertexai.language_models import TextGenerationModel
 
-# Carregar as credenciais do Google Cloud a partir de st.secrets
-# Aqui assumimos que st.secrets["GOOGLE_APPLICATION_CREDENTIALS"] é uma string JSON completa.
-service_account_json = st.secrets["GOOGLE_APPLICATION_CREDENTIALS"]
-service_account_info = json.loads(service_account_json)
-credentials = service_account.Credentials.from_service_account_info(service_account_info)
+from cache_utils import DocumentCache, TTLCache, sha256_bytes
+from metrics_utils import metrics, record_cache, record_remote_call, timed
+from pdf_utils import extract_text_layer, pages_without_text
+from scheduler_utils import schedule
 
-# Inicializar o cliente do Document AI com as credenciais personalizadas
-documentai_client = documentai.DocumentProcessorServiceClient(credentials=credentials)
+# Os SDKs do Google são importados e os clientes criados apenas no primeiro uso
+# (ver `get_credentials`, `get_documentai_client` e `get_text_model`), assim como o
+# cache de documentos (`get_document_cache`), então este módulo pode ser importado
+# sem credenciais, sem o custo de inicialização dos SDKs e sem criar arquivos.
 
-# Inicializar o cliente do Vertex AI com as credenciais personalizadas
-vertexai.init(project='globalhitss-producao', location='us-central1', credentials=credentials)
+PROJECT_ID = 'globalhitss-producao'
+VERTEX_LOCATION = 'us-central1'
+DOCUMENTAI_LOCATION = "us"  # Ajuste conforme a localização do seu processador
+PROCESSOR_ID = 'd3af668f314232de'
+PROCESSOR_VERSION = None  # None usa a versão padrão do processador
+# Identifica o método de extração nas entradas do cache (camada de texto local + OCR das páginas digitalizadas)
+EXTRACTION_METHOD = "textlayer-v1"
 
-def process_document(file_path):
+# Memoização das respostas do modelo de linguagem, chaveada por (prompt, pergunta, parâmetros)
+LLM_CACHE_MAX_SIZE = int(os.environ.get("LLM_CACHE_MAX_SIZE", 1024))
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", 3600))  # segundos
+llm_cache = TTLCache(max_size=LLM_CACHE_MAX_SIZE, ttl=LLM_CACHE_TTL)
+
+_init_lock = threading.RLock()
+
+def process_resource(func):
     """
-    Processa um documento PDF usando o Document AI do GCP.
+    Cria o recurso retornado pela função uma única vez por processo (e por
+    argumentos), no primeiro uso. Ao contrário de `functools.lru_cache`, chamadas
+    simultâneas de várias threads aguardam a mesma criação em vez de repeti-la.
+    Como o módulo permanece importado entre as execuções do script do
+    Streamlit, os clientes são reaproveitados por todas as sessões e interações.
 
     Args:
-        file_path (str): Caminho para o arquivo PDF.
+        func (callable): Função que cria o recurso.
 
     Returns:
-        str: Texto extraído do documento.
+        callable: Função com o recurso em cache.
     """
-    with open(file_path, 'rb') as file:
-        content = file.read()
-    
-    project_id = 'globalhitss-producao'
-    location = "us"  # Ajuste conforme a localização do seu processador
-    processor_id = 'd3af668f314232de'
+    cached = functools.lru_cache(maxsize=None)(func)
 
-    name = f"projects/{project_id}/locations/{location}/processors/{processor_id}"
-    
-    document = {"content": content, "mime_type": "application/pdf"}
+    @functools.wraps(func)
+    def wrapper(*args):
+        with _init_lock:
+            return cached(*args)
 
-    request = {
-        "name": name,
-        "raw_document": document
-    }
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+@process_resource
+def get_credentials():
+    """
+    Carrega as credenciais do Google Cloud a partir de st.secrets.
+    Aqui assumimos que st.secrets["GOOGLE_APPLICATION_CREDENTIALS"] é uma string JSON completa.
+
+    Returns:
+        service_account.Credentials: Credenciais da conta de serviço.
+    """
+    from google.oauth2 import service_account
 
-    result = documentai_client.process_document(request=request)
-    text = ""
-    for page in result.document.pages:
+    service_account_info = json.loads(st.secrets["GOOGLE_APPLICATION_CREDENTIALS"])
+    return service_account.Credentials.from_service_account_info(service_account_info)
+
+@process_resource
+def get_documentai_client():
+    """
+    Returns:
+        DocumentProcessorServiceClient: Cliente do Document AI com as credenciais personalizadas.
+    """
+    from google.cloud import documentai_v1 as documentai
+
+    return documentai.DocumentProcessorServiceClient(credentials=get_credentials())
+
+@process_resource
+def init_vertexai():
+    """
+    Inicializa o Vertex AI com as credenciais personalizadas.
+    """
+    import vertexai
+
+    vertexai.init(project=PROJECT_ID, location=VERTEX_LOCATION, credentials=get_credentials())
+
+@process_resource
+def get_text_model():
+    """
+    Retorna o modelo text-bison, carregado uma única vez por processo.
+
+    Returns:
+        TextGenerationModel: Modelo de linguagem do Vertex AI.
+    """
+    init_vertexai()
+    from vertexai.language_models import TextGenerationModel
+
+    return TextGenerationModel.from_pretrained("text-bison")
+
+@process_resource
+def get_embedding_model(model_name):
+    """
+    Retorna um modelo de embeddings do Vertex AI, carregado uma única vez por processo.
+
+    Args:
+        model_name (str): Nome do modelo de embeddings.
+
+    Returns:
+        TextEmbeddingModel: Modelo de embeddings do Vertex AI.
+    """
+    init_vertexai()
+    from vertexai.language_models import TextEmbeddingModel
+
+    return TextEmbeddingModel.from_pretrained(model_name)
+
+@process_resource
+def get_document_cache():
+    """
+    Returns:
+        DocumentCache: Cache em disco dos textos extraídos, compartilhado entre
+        sessões e processos e aberto (criando o diretório `.cache/`) no primeiro uso.
+    """
+    return DocumentCache()
+
+def document_page_text(document):
+    """
+    Monta o texto de cada página de um documento retornado pelo Document AI.
+
+    Args:
+        document (documentai.Document): Documento processado.
+
+    Returns:
+        dict: Número da página -> texto extraído.
+    """
+    pages = {}
+    for page in document.pages:
+        parts = []
         for paragraph in page.paragraphs:
             for segment in paragraph.layout.text_anchor.text_segments:
                 start_index = segment.start_index if segment.start_index else 0
                 end_index = segment.end_index
-                text += result.document.text[start_index:end_index]
-            text += "\n"
-    return text
+                parts.append(document.text[start_index:end_index])
+            parts.append("\n")
+        pages[page.page_number] = "".join(parts)
+    return pages
 
-def extract_keywords_from_description(description, pergunta='Quais são todas as palavras-chave técnicas desse texto? Me dê uma resposta somente com as palavras separadas por vírgula.', key_word=True):
+def ocr_pages(content, page_numbers=None):
+    """
+    Envia um PDF ao Document AI, opcionalmente apenas algumas páginas.
+
+    Args:
+        content (bytes): Conteúdo do PDF.
+        page_numbers (list): Páginas (a partir de 1) a processar; None processa todas.
+
+    Returns:
+        dict: Número da página -> texto extraído.
+    """
+    document = {"content": content, "mime_type": "application/pdf"}
+
+    request = {
+        "name": processor_name(),
+        "raw_document": document
+    }
+    if page_numbers is not None:
+        request["process_options"] = {"individual_page_selector": {"pages": page_numbers}}
+
+    def process(request):
+        with timed("documentai"):
+            return get_documentai_client().process_document(request=request)
+
+    # Ritmo, concorrência e novas tentativas em caso de 429/5xx ficam a cargo do escalonador
+    result = schedule("documentai", process, request)
+    record_remote_call("documentai")
+    metrics.increment("documentai_pages_total", len(result.document.pages))
+    return document_page_text(result.document)
+
+def processor_name():
+    """
+    Returns:
+        str: Nome completo do recurso do processador do Document AI.
+    """
+    name = f"projects/{PROJECT_ID}/locations/{DOCUMENTAI_LOCATION}/processors/{PROCESSOR_ID}"
+    if PROCESSOR_VERSION:
+        name = f"{name}/processorVersions/{PROCESSOR_VERSION}"
+    return name
+
+def document_cache_key(content):
+    """
+    Calcula a chave do cache de textos extraídos para um PDF.
+
+    Args:
+        content (bytes): Conteúdo do PDF.
+
+    Returns:
+        tuple: SHA-256 do PDF, ID e versão do processador.
+    """
+    return sha256_bytes(content), PROCESSOR_ID, f"{PROCESSOR_VERSION or 'default'}+{EXTRACTION_METHOD}"
+
+def merge_page_text(pages, ocr_text):
+    """
+    Junta o texto local das páginas com o texto obtido por OCR.
+
+    Args:
+        pages (list or None): Texto local de cada página (None se o PDF não pôde ser lido localmente).
+        ocr_text (dict): Número da página -> texto extraído pelo OCR.
+
+    Returns:
+        str: Texto completo do documento.
+    """
+    if pages is None:
+        return "".join(ocr_text[number] for number in sorted(ocr_text))
+    pages = list(pages)
+    for number in pages_without_text(pages):
+        pages[number - 1] = ocr_text.get(number, "")
+    return "\n".join(pages)
+
+def process_document(file_path, pdf=None):
+    """
+    Extrai o texto de um documento PDF.
+
+    A camada de texto embutida no PDF é lida localmente; apenas as páginas sem
+    texto (digitalizadas ou só com imagens) são enviadas ao Document AI do GCP.
+    O resultado é armazenado em cache pelo SHA-256 do PDF, então o mesmo
+    arquivo enviado novamente (mesmo com outro nome) não é reprocessado.
+
+    Args:
+        file_path (str): Caminho para o arquivo PDF.
+        pdf (tuple): Conteúdo e camada de texto já lidos (ver `pdf_utils.read_pdf`);
+            se None, o arquivo é lido aqui e a camada de texto só é extraída
+            quando o texto não está no cache.
+
+    Returns:
+        str: Texto extraído do documento.
+    """
+    with timed("ocr"):
+        if pdf is not None:
+            content, pages = pdf
+        else:
+            with open(file_path, 'rb') as file:
+                content = file.read()
+
+        cache_key = document_cache_key(content)
+        cached_text = get_document_cache().get(*cache_key)
+        record_cache("documento", cached_text is not None)
+        if cached_text is not None:
+            return cached_text
+
+        if pdf is None:
+            pages = extract_text_layer(content)
+        if pages is None:
+            # PDF ilegível localmente: todo o documento vai para o OCR
+            ocr_text = ocr_pages(content)
+        else:
+            missing_pages = pages_without_text(pages)
+            ocr_text = ocr_pages(content, missing_pages) if missing_pages else {}
+        text = merge_page_text(pages, ocr_text)
+
+        get_document_cache().put(*cache_key, text)
+        return text
+
+def extract_keywords_from_description(description, pergunta='Quais são todas as palavras-chave técnicas desse texto? Me dê uma resposta somente com as palavras separadas por vírgula.', key_word=True, prompt_name='palavras_chave'):
     """
     Extrai palavras-chave técnicas da descrição usando o modelo text-bison do Vertex AI.
 
+    Respostas para a mesma descrição, pergunta e parâmetros são reaproveitadas
+    do cache em memória até expirarem (`LLM_CACHE_TTL`). As chamadas ao modelo
+    passam pelo escalonador do serviço, na fila do contexto atual (ver
+    `scheduler_utils.priority_lane`).
+
     Args:
         description (str): Descrição do trabalho ou texto do currículo.
         pergunta (str): Pergunta a ser feita ao modelo de linguagem.
         key_word (bool): Se True, retorna as palavras-chave; caso contrário, retorna o texto completo.
+        prompt_name (str): Nome da pergunta usado nas métricas.
 
     Returns:
         list or str: Lista de palavras-chave ou texto extraído.
@@ -76,15 +288,46 @@ def extract_keywords_from_description(description, pergunta='Quais são todas as
  
     texto_trat = f"{description}\nQ: {pergunta}\nA:"
 
-    model = TextGenerationModel.from_pretrained("text-bison")
-    response = model.predict(
-        texto_trat,
-        **parameters,
-    )
-    
-    resposta = response.text
+    cache_key = (sha256_bytes(texto_trat.encode("utf-8")), tuple(sorted(parameters.items())))
+    resposta = llm_cache.get(cache_key)
+    record_cache("llm", resposta is not None)
+    if resposta is None:
+        model = get_text_model()
+
+        def predict():
+            with timed("llm", prompt=prompt_name):
+                return model.predict(
+                    texto_trat,
+                    **parameters,
+                )
+
+        response = schedule("vertex_llm", predict)
+        record_remote_call("vertex_llm")
+        resposta = response.text
+        llm_cache.set(cache_key, resposta)
+        record_llm_usage(prompt_name, texto_trat, response)
+
     if key_word:
         key_words = [kw.strip() for kw in resposta.replace('(','').replace(')','').split(',')]
     else:
         key_words = resposta.strip()
     return key_words
+
+def record_llm_usage(prompt_name, prompt, response):
+    """
+    Registra o tamanho da pergunta e da resposta do modelo (caracteres e, quando
+    o Vertex AI os informa, tokens).
+
+    Args:
+        prompt_name (str): Nome da pergunta usado nas métricas.
+        prompt (str): Texto enviado ao modelo.
+        response (TextGenerationResponse): Resposta do modelo.
+    """
+    metrics.increment("llm_characters_total", len(prompt), prompt=prompt_name, direction="entrada")
+    metrics.increment("llm_characters_total", len(response.text or ""), prompt=prompt_name, direction="saida")
+    raw_response = getattr(response, "raw_prediction_response", None)
+    token_metadata = (getattr(raw_response, "metadata", None) or {}).get("tokenMetadata", {})
+    for direction, field in (("entrada", "inputTokenCount"), ("saida", "outputTokenCount")):
+        tokens = token_metadata.get(field, {}).get("totalTokens")
+        if tokens is not None:
+            metrics.increment("llm_tokens_total", tokens, prompt=prompt_name, direction=direction)
@@ -0,0 +1,153 @@
+import re
+import threading
+import unicodedata
+
+# Tokens técnicos: palavras, números e termos como "c++", "c#", ".net" e "node.js"
+TOKEN_PATTERN = re.compile(r"\.?[a-z0-9]+(?:[.\-][a-z0-9]+)*[+#]*")
+# Tamanho máximo dos n-gramas indexados diretamente
+MAX_NGRAM = 3
+
+
+def normalize_text(text):
+    """
+    Normaliza um texto para busca: minúsculas e sem acentos.
+
+    Args:
+    text (str): Texto original.
+
+    Returns:
+    str: Texto normalizado.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    """
+    Separa um texto em tokens normalizados.
+
+    Args:
+    text (str): Texto original.
+
+    Returns:
+    list: Lista de tokens.
+    """
+    return TOKEN_PATTERN.findall(normalize_text(text))
+
+
+def keyword_variants(keyword):
+    """
+    Gera as formas pesquisáveis de uma palavra-chave: a frase normalizada e a
+    versão sem espaços (ex.: "power bi" e "powerbi").
+
+    Args:
+    keyword (str): Palavra-chave informada pelo usuário ou extraída pelo LLM.
+
+    Returns:
+    list: Lista de n-gramas normalizados, sem repetições.
+    """
+    tokens = tokenize(keyword)
+    if not tokens:
+        return []
+    variants = [" ".join(tokens)]
+    if len(tokens) > 1:
+        variants.append("".join(tokens))
+    return variants
+
+
+class KeywordIndex:
+    """
+    Índice invertido incremental dos currículos. Cada documento é indexado uma
+    única vez, no momento da ingestão, por seus tokens e n-gramas (até
+    `MAX_NGRAM`). Frases mais longas são resolvidas pela interseção dos tokens
+    seguida de verificação no texto normalizado.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._documents = {}
+        self._lock = threading.Lock()
+        # Último registro do banco de currículos já indexado (ver store_utils.sync_index)
+        self.synced_id = 0
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._documents
+
+    def add(self, doc_id, text):
+        """
+        Indexa (ou reindexa) o texto de um currículo.
+
+        Args:
+        doc_id (str): Identificador do currículo.
+        text (str): Texto extraído do currículo.
+        """
+        tokens = tokenize(text)
+        ngrams = set()
+        for size in range(1, MAX_NGRAM + 1):
+            for start in range(len(tokens) - size + 1):
+                ngrams.add(" ".join(tokens[start:start + size]))
+        with self._lock:
+            if doc_id in self._documents:
+                self._remove(doc_id)
+            self._documents[doc_id] = (" " + " ".join(tokens) + " ", ngrams)
+            for ngram in ngrams:
+                self._postings.setdefault(ngram, set()).add(doc_id)
+
+    def remove(self, doc_id):
+        """
+        Remove um currículo do índice.
+
+        Args:
+        doc_id (str): Identificador do currículo.
+        """
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        _, ngrams = self._documents.pop(doc_id, ("", ()))
+        for ngram in ngrams:
+            postings = self._postings.get(ngram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[ngram]
+
+    def lookup(self, phrase):
+        """
+        Retorna os currículos que contêm uma frase já normalizada.
+
+        Args:
+        phrase (str): N-grama normalizado (tokens separados por espaço).
+
+        Returns:
+        set: Identificadores dos currículos que contêm a frase.
+        """
+        tokens = phrase.split()
+        with self._lock:
+            if len(tokens) <= MAX_NGRAM:
+                return set(self._postings.get(phrase, ()))
+            candidates = set.intersection(*(self._postings.get(token, set()) for token in tokens))
+            needle = f" {phrase} "
+            return {doc_id for doc_id in candidates if needle in self._documents[doc_id][0]}
+
+    def search(self, keywords):
+        """
+        Busca palavras-chave no índice, considerando também a variação sem espaços.
+
+        Args:
+        keywords (list): Palavras-chave a serem buscadas.
+
+        Returns:
+        dict: Identificador do currículo -> conjunto de palavras-chave encontradas.
+        """
+        matches = {}
+        for keyword in keywords:
+            doc_ids = set()
+            for variant in keyword_variants(keyword):
+                doc_ids |= self.lookup(variant)
+            for doc_id in doc_ids:
+                matches.setdefault(doc_id, set()).add(keyword)
+        return matches
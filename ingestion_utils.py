@@ -0,0 +1,547 @@
+import contextvars
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from cache_utils import sha256_file
+from contact_utils import extract_contact_details, guess_name, NAME_CONFIDENCE_THRESHOLD
+from dedup_utils import text_layer_fingerprint
+from metrics_utils import timed, track_remote_calls
+from ocr_utils import OnlineOcrBackend
+from pdf_utils import read_pdf
+from processing_utils import extract_structured_info
+from profile_utils import build_profile
+from scheduler_utils import BULK, is_throttling_error, priority_lane
+from semantic_utils import backfill_embeddings, embed_resume
+
+# Quantidade máxima de currículos processados simultaneamente
+MAX_IN_FLIGHT = int(os.environ.get("INGESTION_MAX_IN_FLIGHT", 8))
+# Tentativas por etapa e espera base (em segundos) do backoff exponencial
+MAX_RETRIES = int(os.environ.get("INGESTION_MAX_RETRIES", 3))
+RETRY_BACKOFF = float(os.environ.get("INGESTION_RETRY_BACKOFF", 1.0))
+# Reprocessamento em segundo plano: intervalo (em segundos) e limite de falhas de uma mesma etapa
+STAGE_RETRY_INTERVAL = float(os.environ.get("STAGE_RETRY_INTERVAL", 60))
+STAGE_MAX_ATTEMPTS = int(os.environ.get("STAGE_MAX_ATTEMPTS", 5))
+# Segundos sem renovação após os quais a reserva de um currículo expira (processo interrompido)
+STAGE_LEASE_TIMEOUT = float(os.environ.get("STAGE_LEASE_TIMEOUT", 300))
+
+# Etapas do processamento de um currículo, na ordem em que são executadas
+STAGES = ("upload", "ocr", "contatos", "palavras_chave", "experiencia", "embedding")
+# Campo de `extract_structured_info` -> etapa em que é extraído
+FIELD_STAGES = {"name": "contatos", "keywords": "palavras_chave", "experience": "experiencia"}
+
+logger = logging.getLogger(__name__)
+
+
+def with_retry(func, *args, retries=MAX_RETRIES, backoff=RETRY_BACKOFF, **kwargs):
+    """
+    Executa uma etapa repetindo-a com backoff exponencial em caso de erro.
+
+    Respostas 429/5xx não são repetidas aqui: as chamadas remotas passam pelos
+    escalonadores (`scheduler_utils.schedule`), que já as repetem com backoff, e
+    o erro só chega a esta função depois de esgotadas as tentativas deles.
+
+    Args:
+    func (callable): Função da etapa.
+    retries (int): Número máximo de tentativas.
+    backoff (float): Espera base em segundos entre as tentativas.
+
+    Returns:
+    object: Retorno da função.
+    """
+    for attempt in range(retries):
+        try:
+            return func(*args, **kwargs)
+        except Exception as error:
+            if attempt == retries - 1 or is_throttling_error(error):
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def duplicate_result(filename, file_path, sha256, match):
+    """
+    Monta o resultado de um arquivo identificado como duplicata.
+
+    Args:
+    filename (str): Nome do arquivo enviado.
+    file_path (str): Caminho do PDF em disco.
+    sha256 (str): SHA-256 do PDF.
+    match (tuple): Nome do arquivo original e motivo.
+
+    Returns:
+    dict: Resultado com o original em `duplicate_of`.
+    """
+    duplicate_of, reason = match
+    return {"filename": filename, "sha256": sha256, "path": file_path, "duplicate_of": duplicate_of, "reason": reason}
+
+
+class StageError(Exception):
+    """
+    Falha em uma ou mais etapas de um currículo. As etapas concluídas ficam
+    gravadas e apenas as que falharam são refeitas na próxima tentativa.
+    """
+
+    def __init__(self, filename, errors):
+        self.filename = filename
+        self.errors = errors
+        details = "; ".join(f"{stage}: {error}" for stage, error in errors.items())
+        super().__init__(f"Etapas com falha em {filename} ({details})")
+
+
+class JobLease:
+    """
+    Reserva, no banco, dos currículos de uma ingestão, para que outra ingestão
+    (de outro processo ou o reprocessamento em segundo plano) não os processe ao
+    mesmo tempo. A reserva é renovada a cada terço de `timeout` enquanto a
+    ingestão roda; se o processo parar, ela expira e os currículos voltam a ser
+    retomados por `retry_pending`.
+    """
+
+    def __init__(self, store, timeout=STAGE_LEASE_TIMEOUT):
+        self.store = store
+        self.timeout = timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def claim(self, jobs):
+        """
+        Args:
+        jobs (list): Tuplas (nome do arquivo, resultado da etapa de envio).
+
+        Returns:
+        set: Nomes dos arquivos reservados (os demais estão com outra ingestão).
+        """
+        claimed = self.store.claim_jobs(jobs, self.owner, self.timeout)
+        self._start()
+        return claimed
+
+    def reserve(self, filename, directory, sha256):
+        """
+        Reserva um novo arquivo antes de gravá-lo em disco (ver `ResumeStore.reserve_upload`).
+
+        Args:
+        filename (str): Nome do arquivo enviado.
+        directory (str): Diretório onde o PDF será gravado.
+        sha256 (str): SHA-256 do PDF.
+
+        Returns:
+        str: Nome com que o arquivo deve ser gravado.
+        """
+        name = self.store.reserve_upload(filename, directory, sha256, self.owner)
+        self._start()
+        return name
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._renew, name="reserva", daemon=True)
+            self._thread.start()
+
+    def _renew(self):
+        while not self._stop_event.wait(self.timeout / 3):
+            try:
+                self.store.renew_jobs(self.owner)
+            except Exception:
+                logger.exception("Falha ao renovar a reserva dos currículos")
+
+    def release(self, filenames=None):
+        self.store.release_jobs(self.owner, filenames)
+
+    def close(self):
+        """
+        Encerra a renovação e libera os currículos ainda reservados.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.release()
+
+
+class ResumeStages:
+    """
+    Estado das etapas de um currículo, gravado no banco a cada etapa concluída
+    ou com falha. Sem banco, o estado fica apenas em memória.
+    """
+
+    def __init__(self, filename, store=None, state=None):
+        self.filename = filename
+        self.store = store
+        if state is None:
+            state = store.stage_state(filename) if store is not None else {}
+        self.state = state
+
+    def done(self, stage):
+        return self.state.get(stage, {}).get("status") == "ok"
+
+    def value(self, stage):
+        return self.state[stage]["value"]
+
+    def complete(self, stage, value):
+        if self.store is not None:
+            self.store.save_stage(self.filename, stage, value)
+        self.state[stage] = {"status": "ok", "value": value}
+
+    def fail(self, stage, error):
+        if self.store is not None:
+            self.store.save_stage(self.filename, stage, error=error)
+        self.state[stage] = {"status": "erro", "value": None}
+
+
+def process_resume(filename, file_path, llm_pool, ocr, sha256=None, duplicates=None, stages=None):
+    """
+    Processa um currículo: OCR seguido de uma única extração estruturada pelo LLM
+    e do cálculo do embedding usado no ranking semântico.
+
+    Cada etapa concluída é registrada em `stages` e não é refeita quando o
+    currículo é processado novamente; se alguma etapa falhar, as demais são
+    concluídas e a exceção (`StageError`) lista as que falharam. A falha do
+    embedding não impede o resultado, que é entregue com `embedding` None.
+
+    As chamadas remotas entram na fila de lote dos escalonadores, atrás das
+    consultas feitas pela interface.
+
+    Args:
+    filename (str): Nome do arquivo enviado.
+    file_path (str): Caminho do PDF em disco.
+    llm_pool (ThreadPoolExecutor): Pool usado para as chamadas ao modelo de linguagem.
+    ocr (callable): Etapa de OCR, recebe o caminho do PDF e retorna o texto.
+    sha256 (str): SHA-256 do PDF, se já calculado.
+    duplicates (DuplicateIndex): Índice consultado com o texto do OCR, antes das
+    chamadas ao LLM (None quando a verificação já foi feita com a camada de texto).
+    stages (ResumeStages): Estado das etapas do currículo (padrão: em memória).
+
+    Returns:
+    dict: Resultado do processamento do currículo.
+    """
+    stages = stages or ResumeStages(filename)
+    with timed("ingestao"), track_remote_calls(), priority_lane(BULK):
+        return _process_resume(filename, file_path, llm_pool, ocr, sha256, duplicates, stages)
+
+
+def _run_stage(stages, stage, func, *args):
+    if stages.done(stage):
+        return stages.value(stage)
+    try:
+        value = func(*args)
+    except Exception as error:
+        stages.fail(stage, error)
+        raise StageError(stages.filename, {stage: error}) from error
+    stages.complete(stage, value)
+    return value
+
+
+def _process_resume(filename, file_path, llm_pool, ocr, sha256, duplicates, stages):
+    sha256 = sha256 or sha256_file(file_path)
+    extracted_text = _run_stage(stages, "ocr", ocr, file_path)
+    if duplicates is not None:
+        match = duplicates.match_or_add(filename, text=extracted_text)
+        if match is not None:
+            return duplicate_result(filename, file_path, sha256, match)
+
+    phones, emails, linkedin_links = extract_contact_details(extracted_text)
+    name, confidence = guess_name(extracted_text)
+    fields = [field for field, stage in FIELD_STAGES.items() if not stages.done(stage)]
+    if "name" in fields and confidence >= NAME_CONFIDENCE_THRESHOLD:
+        fields.remove("name")
+        stages.complete("contatos", {"name": name, "phones": phones, "emails": emails, "linkedin_links": linkedin_links})
+
+    # As tarefas herdam o contexto para que suas chamadas remotas contem para este currículo
+    fields_future = embedding_future = None
+    if fields:
+        fields_future = llm_pool.submit(contextvars.copy_context().run, with_retry, extract_structured_info,
+                                        extracted_text, fields)
+    if not stages.done("embedding"):
+        embedding_future = llm_pool.submit(contextvars.copy_context().run, with_retry, embed_resume, extracted_text)
+
+    errors = {}
+    if fields_future is not None:
+        try:
+            values = fields_future.result()
+        except Exception as error:
+            for field in fields:
+                stages.fail(FIELD_STAGES[field], error)
+                errors[FIELD_STAGES[field]] = error
+        else:
+            if "name" in values:
+                stages.complete("contatos", {"name": values["name"], "phones": phones, "emails": emails,
+                                             "linkedin_links": linkedin_links})
+            if "keywords" in values:
+                stages.complete("palavras_chave", values["keywords"])
+            if "experience" in values:
+                stages.complete("experiencia", values["experience"])
+    if embedding_future is not None:
+        try:
+            model, vector = embedding_future.result()
+        except Exception as error:
+            # O embedding só é usado no ranking semântico: o currículo é gravado sem ele
+            # e o vetor é calculado depois por `backfill_embeddings` (ver `retry_pending`)
+            stages.fail("embedding", error)
+            logger.warning("Embedding de %s não calculado: %s", filename, error)
+        else:
+            stages.complete("embedding", {"model": model, "vector": [float(x) for x in vector]})
+    if errors:
+        raise StageError(filename, errors) from next(iter(errors.values()))
+
+    contacts = stages.value("contatos")
+    embedding = stages.value("embedding") if stages.done("embedding") else None
+    return {
+        "filename": filename,
+        "sha256": sha256,
+        "text": extracted_text,
+        "path": file_path,
+        "name": contacts["name"],
+        "phones": contacts["phones"],
+        "emails": contacts["emails"],
+        "linkedin_links": contacts["linkedin_links"],
+        "keywords": stages.value("palavras_chave"),
+        "experience": stages.value("experiencia"),
+        "embedding": (embedding["model"], np.asarray(embedding["vector"], dtype=np.float32)) if embedding else None,
+        **build_profile(stages.value("palavras_chave"), stages.value("experiencia")),
+    }
+
+
+def ingest_resumes(files, max_in_flight=MAX_IN_FLIGHT, ocr_backend=None, duplicates=None, store=None, lease=None):
+    """
+    Processa vários currículos com concorrência limitada.
+
+    As etapas de OCR e de LLM de arquivos diferentes rodam em paralelo e os
+    resultados são entregues na ordem em que ficam prontos. Com um backend de
+    OCR em lote, o OCR de todos os arquivos é feito antes das etapas de LLM.
+
+    Com um índice de duplicatas, cada arquivo é antes comparado localmente (SHA-256,
+    contatos e texto da camada de texto do PDF) com o banco e com os demais
+    arquivos do lote. Duplicatas não passam pelo OCR nem pelo LLM e são
+    entregues ao final, com o original em `duplicate_of`. O PDF lido nessa
+    verificação é repassado ao OCR, que não o lê de novo.
+
+    Com um banco de currículos, o estado de cada etapa é gravado à medida que
+    avança: um arquivo que falhou retoma do ponto em que parou, sem refazer as
+    etapas já concluídas (ver `retry_pending`). Os arquivos ficam reservados
+    para esta ingestão até serem entregues (ver `JobLease`); os que já estão
+    reservados por outra são entregues com erro, sem processamento.
+
+    Args:
+    files (list): Lista de tuplas (nome do arquivo, caminho do PDF).
+    max_in_flight (int): Quantidade máxima de currículos em processamento.
+    ocr_backend (OcrBackend): Backend de OCR (padrão: uma requisição síncrona por PDF).
+    duplicates (DuplicateIndex): Índice de duplicatas (None para não verificar).
+    store (ResumeStore): Banco onde o estado das etapas é gravado (None para mantê-lo em memória).
+    lease (JobLease): Reserva em que os arquivos já foram registrados (ver `JobLease.reserve`);
+    se None, uma nova é criada. Em ambos os casos é encerrada ao final.
+
+    Yields:
+    tuple: Nome do arquivo, resultado (ou None) e exceção (ou None).
+    """
+    ocr_backend = ocr_backend or OnlineOcrBackend()
+    # O envio é registrado antes de qualquer processamento, para que uma
+    # interrupção no meio do lote não perca os arquivos ainda não iniciados
+    uploads = []
+    for filename, file_path in files:
+        try:
+            uploads.append((filename, _upload_stage(store, filename, file_path)))
+        except OSError as error:
+            # Um PDF que não pode ser lido falha sozinho, sem interromper os demais
+            yield filename, None, error
+    registered = {filename for filename, _ in uploads}
+    files = [(filename, file_path) for filename, file_path in files if filename in registered]
+    if store is not None:
+        lease = lease or JobLease(store)
+        claimed = lease.claim(uploads)
+        for filename, _ in files:
+            if filename not in claimed:
+                yield filename, None, RuntimeError(f"{filename} já está sendo processado por outra ingestão")
+        files = [(filename, file_path) for filename, file_path in files if filename in claimed]
+        uploads = [(filename, upload) for filename, upload in uploads if filename in claimed]
+
+    try:
+        for filename, result, error in _ingest_resumes(files, uploads, max_in_flight, ocr_backend, duplicates, store):
+            yield filename, result, error
+            # Liberado só depois de entregue, quando o resultado já foi gravado
+            if lease is not None:
+                lease.release([filename])
+    finally:
+        if lease is not None:
+            lease.close()
+
+
+def _upload_stage(store, filename, file_path):
+    # Em retomadas vale o hash gravado no envio: o PDF nem precisa ser lido de novo
+    if store is not None:
+        upload = store.stage_state(filename).get("upload")
+        if upload is not None and upload["status"] == "ok":
+            return upload["value"]
+    return {"path": file_path, "sha256": sha256_file(file_path)}
+
+
+def _ingest_resumes(files, uploads, max_in_flight, ocr_backend, duplicates, store):
+    states, hashes = {}, {}
+    for filename, upload in uploads:
+        # Com banco, o envio já foi gravado ao reservar o arquivo; em retomadas vale o registro original
+        states[filename] = ResumeStages(filename, store)
+        if not states[filename].done("upload"):
+            states[filename].complete("upload", upload)
+        hashes[filename] = states[filename].value("upload").get("sha256") or upload["sha256"]
+
+    def check_duplicate(filename, file_path):
+        # O PDF é lido uma única vez: a camada de texto usada na verificação segue para o OCR
+        if duplicates is None:
+            return None, None, True
+        try:
+            pdf = read_pdf(file_path)
+        except OSError as error:
+            # Com o OCR já concluído, a verificação é feita com o texto dele
+            if states[filename].done("ocr"):
+                return None, None, False
+            states[filename].fail("ocr", error)
+            raise StageError(filename, {"ocr": error}) from error
+        text, complete = text_layer_fingerprint(pdf[1])
+        match = duplicates.match_or_add(filename, hashes[filename], text, index_text=complete)
+        return pdf, match, complete
+
+    def try_check_duplicate(filename, file_path):
+        try:
+            return check_duplicate(filename, file_path)
+        except StageError as error:
+            return error
+
+    def ingest_online(filename, file_path):
+        pdf, match, complete = check_duplicate(filename, file_path)
+        if match is not None:
+            return duplicate_result(filename, file_path, hashes[filename], match)
+
+        def ocr(file_path):
+            return with_retry(ocr_backend.process, file_path, pdf)
+        return process_resume(filename, file_path, llm_pool, ocr, hashes[filename],
+                              None if complete else duplicates, states[filename])
+
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="ingestao") as file_pool, \
+            ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm") as llm_pool:
+        if ocr_backend.batched:
+            # O lote precisa de todos os arquivos, então a verificação de duplicatas vem antes
+            checked = list(file_pool.map(lambda file: try_check_duplicate(*file), files))
+            pending, linked, ocr_paths, pdfs = [], [], [], {}
+            for (filename, file_path), check in zip(files, checked):
+                if isinstance(check, Exception):
+                    yield filename, None, check
+                    continue
+                pdf, match, complete = check
+                if match is not None:
+                    linked.append(duplicate_result(filename, file_path, hashes[filename], match))
+                    continue
+                pending.append((filename, file_path, complete))
+                # Arquivos com o OCR já concluído em uma tentativa anterior não voltam para o lote
+                if not states[filename].done("ocr"):
+                    ocr_paths.append(file_path)
+                    if pdf is not None:
+                        pdfs[file_path] = pdf
+            with priority_lane(BULK):
+                texts = ocr_backend.process_many(ocr_paths, pdfs)
+
+            def ocr(file_path):
+                text = texts[file_path]
+                if isinstance(text, Exception):
+                    raise text
+                return text
+
+            futures = {
+                file_pool.submit(process_resume, filename, file_path, llm_pool, ocr,
+                                 hashes[filename], None if complete else duplicates,
+                                 states[filename]): filename
+                for filename, file_path, complete in pending
+            }
+        else:
+            # A leitura do PDF e a verificação de duplicatas de cada arquivo rodam
+            # na tarefa dele, em paralelo com as chamadas remotas dos demais
+            futures = {file_pool.submit(ingest_online, filename, file_path): filename for filename, file_path in files}
+            linked = []
+
+        failed = set()
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                result = future.result()
+            except Exception as error:
+                failed.add(filename)
+                if duplicates is not None:
+                    duplicates.remove(filename)
+                yield filename, None, error
+                continue
+            if result.get("duplicate_of"):
+                linked.append(result)
+            else:
+                yield filename, result, None
+
+        # Duplicatas de arquivos do mesmo lote só são vinculadas se o original foi processado
+        for result in linked:
+            if result["duplicate_of"] in failed:
+                yield result["filename"], None, RuntimeError(
+                    f"duplicata de {result['duplicate_of']}, que não pôde ser processado"
+                )
+            else:
+                yield result["filename"], result, None
+
+
+def retry_pending(store, max_in_flight=MAX_IN_FLIGHT, max_attempts=STAGE_MAX_ATTEMPTS, ocr_backend=None):
+    """
+    Retoma os currículos com processamento incompleto, refazendo apenas as
+    etapas que falharam ou não chegaram a rodar, e grava os que forem concluídos.
+    Em seguida calcula os embeddings dos currículos gravados sem eles.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    max_in_flight (int): Quantidade máxima de currículos em processamento.
+    max_attempts (int): Falhas de uma mesma etapa a partir das quais o currículo não é mais retomado.
+    ocr_backend (OcrBackend): Backend de OCR (padrão: uma requisição síncrona por PDF).
+
+    Returns:
+    tuple: Quantidade de currículos concluídos e que continuam com falha.
+    """
+    # Currículos reservados por uma ingestão em andamento ficam de fora (ver `JobLease`)
+    jobs = store.pending_jobs(max_attempts, lease_timeout=STAGE_LEASE_TIMEOUT)
+    completed = failures = 0
+    for filename, result, error in ingest_resumes(jobs, max_in_flight=max_in_flight, ocr_backend=ocr_backend,
+                                                  store=store):
+        if error is not None:
+            failures += 1
+            logger.warning("Reprocessamento de %s falhou: %s", filename, error)
+        elif result.get("duplicate_of"):
+            store.add_duplicate(result)
+            completed += 1
+        else:
+            store.add(result)
+            completed += 1
+    try:
+        backfill_embeddings(store)
+    except Exception as error:
+        logger.warning("Cálculo dos embeddings pendentes falhou: %s", error)
+    return completed, failures
+
+
+class RetryWorker(threading.Thread):
+    """
+    Thread que retoma periodicamente, em segundo plano, os currículos com
+    etapas pendentes (ver `retry_pending`).
+    """
+
+    def __init__(self, store, interval=STAGE_RETRY_INTERVAL, max_in_flight=MAX_IN_FLIGHT):
+        super().__init__(name="reprocessamento", daemon=True)
+        self.store = store
+        self.interval = interval
+        self.max_in_flight = max_in_flight
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                retry_pending(self.store, max_in_flight=self.max_in_flight)
+            except Exception:
+                logger.exception("Falha no reprocessamento em segundo plano")
+
+    def stop(self):
+        self._stop_event.set()
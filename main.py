@@ -1,12 +1,16 @@
 import streamlit as st
-import pandas as pd
 import zipfile
 import io
 from datetime import datetime
 
-from gcp_utils import process_document, extract_keywords_from_description
-from processing_utils import extract_contact_info
-from ui_utils import display_results, display_search_results, display_job_analysis, display_resume_bank, display_resume_triage
+from cache_utils import sha256_bytes
+from dedup_utils import DuplicateIndex
+from ingestion_utils import ingest_resumes, JobLease, MAX_IN_FLIGHT, RetryWorker, STAGE_MAX_ATTEMPTS
+from ocr_utils import get_ocr_backend
+from index_utils import KeywordIndex
+from semantic_utils import SemanticIndex, embedding_model_name
+from store_utils import ResumeStore, sync_duplicate_index, sync_index, sync_semantic_index
+from ui_utils import display_results, display_search_results, display_job_analysis, display_resume_bank, display_resume_triage, display_diagnostics
 
 # Adicione a imagem no cabeçalho
 #st.image("img/prototipo-globalhitss.png", use_column_width=True)
@@ -16,75 +20,117 @@ st.title("Análise de Currículos")
 # Upload de arquivos PDF
 uploaded_files = st.file_uploader("Selecione os currículos", type=["pdf"], accept_multiple_files=True)
 
-# Inicializar os estados da sessão
-if 'results' not in st.session_state:
-    st.session_state.results = []
-if 'curriculos_df' not in st.session_state:
-    st.session_state.curriculos_df = pd.DataFrame(columns=["Nome do Arquivo", "Nome Completo", "Telefone", "Email", "LinkedIn",
-                                                           "Palavras-Chave Técnica", "Tempo Experiência", "PDF Path"])
+# Banco de currículos e índice invertido compartilhados entre sessões
+@st.cache_resource
+def get_resume_store():
+    return ResumeStore()
+
+@st.cache_resource
+def get_keyword_index():
+    return KeywordIndex()
+
+@st.cache_resource
+def get_semantic_index():
+    return SemanticIndex()
+
+@st.cache_resource
+def get_duplicate_index():
+    return DuplicateIndex()
+
+# Reprocessamento em segundo plano das etapas que falharam, um por processo
+@st.cache_resource
+def start_retry_worker():
+    worker = RetryWorker(get_resume_store())
+    worker.start()
+    return worker
+
+store = get_resume_store()
+keyword_index = get_keyword_index()
+semantic_index = get_semantic_index()
+duplicate_index = get_duplicate_index()
+start_retry_worker()
+# O backend de embeddings só é criado quando o ranking semântico é usado
+embedding_model = embedding_model_name()
+sync_index(store, keyword_index)
+sync_semantic_index(store, semantic_index, embedding_model)
+sync_duplicate_index(store, duplicate_index)
 
 # Processamento dos arquivos carregados
 if uploaded_files:
-    results = []
-    progress_bar = st.progress(0)
-    num_files = len(uploaded_files)
-
-    for i, uploaded_file in enumerate(uploaded_files):
-        if not any(result['filename'] == uploaded_file.name for result in st.session_state.results):
-            with st.spinner(f"Processando {uploaded_file.name}..."):
-                file_path = f"docs/{uploaded_file.name}"
-                with open(file_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                
-                extracted_text = process_document(file_path)
-                name, phones, emails, linkedin_links = extract_contact_info(extracted_text)
-                keywords = extract_keywords_from_description(description=extracted_text)
-                experience = extract_keywords_from_description(description=extracted_text, pergunta="Qual o tempo de experiência desse candidato? Me diga apenas o número em anos.", key_word=False)
-                
-                result = {
-                    "filename": uploaded_file.name,
-                    "text": extracted_text,
-                    "path": file_path,
-                    "name": name,
-                    "phones": phones,
-                    "emails": emails,
-                    "linkedin_links": linkedin_links,
-                    "keywords": keywords,
-                    "experience": experience
-                }
-                results.append(result)
-                
-                new_row = {
-                    "Nome do Arquivo": uploaded_file.name, 
-                    "Nome Completo": name, 
-                    "Telefone": ", ".join(phones), 
-                    "Email": ", ".join(emails),
-                    "LinkedIn": ", ".join(linkedin_links),
-                    "Palavras-Chave Técnica": keywords,
-                    "Tempo Experiência": experience,
-                    "PDF Path": file_path
-                }
-                st.session_state.curriculos_df = pd.concat([st.session_state.curriculos_df, pd.DataFrame([new_row])], ignore_index=True)
-        
-        progress_bar.progress((i + 1) / num_files)
-    
-    st.session_state.results.extend(results)
-    st.success("Processamento concluído!")
+    pending_files = []
+    lease = None
+    # Arquivos enviados nesta sessão continuam no seletor a cada interação e não geram aviso
+    session_uploads = st.session_state.setdefault("uploaded_sha256", set())
+    for uploaded_file in uploaded_files:
+        # O banco é compartilhado: o arquivo é reconhecido pelo conteúdo, não pelo nome
+        content = uploaded_file.getbuffer()
+        sha256 = sha256_bytes(content)
+        if sha256 in session_uploads:
+            continue
+        session_uploads.add(sha256)
+        existing = store.find_sha256(sha256)
+        if existing is not None:
+            # Envio anterior com etapas pendentes: o reprocessamento é feito pela aba "Diagnóstico"
+            stages = store.stage_state(existing)
+            if not stages:
+                st.info(f"{uploaded_file.name} já foi enviado ao banco de currículos (como {existing}) e não foi processado novamente.")
+            elif any(stage["status"] == "erro" and stage["attempts"] >= STAGE_MAX_ATTEMPTS for stage in stages.values()):
+                st.info(f"{uploaded_file.name} já foi enviado (como {existing}), mas seu processamento falhou {STAGE_MAX_ATTEMPTS} vezes e não é mais refeito automaticamente. Use \"Reprocessar agora\" na aba \"Diagnóstico\".")
+            else:
+                st.info(f"{uploaded_file.name} já foi enviado (como {existing}) e seu processamento ainda não foi concluído. As etapas pendentes são refeitas em segundo plano; acompanhe ou reprocesse agora na aba \"Diagnóstico\".")
+            continue
+        # O nome é reservado no banco antes da gravação, para que arquivos homônimos
+        # (no mesmo envio ou em sessões simultâneas) não sobrescrevam um ao outro
+        lease = lease or JobLease(store)
+        filename = lease.reserve(uploaded_file.name, "docs", sha256)
+        if filename != uploaded_file.name:
+            st.info(f"Já existe outro currículo chamado {uploaded_file.name}; este foi gravado como {filename}.")
+        file_path = f"docs/{filename}"
+        with open(file_path, "wb") as f:
+            f.write(content)
+        pending_files.append((filename, file_path))
+
+    if pending_files:
+        progress_bar = st.progress(0)
+        num_files = len(pending_files)
+
+        ocr_backend = get_ocr_backend(num_files)
+        if ocr_backend.batched:
+            progress_bar.progress(0, text=f"Enviando {num_files} currículos para OCR em lote...")
+
+        for i, (filename, result, error) in enumerate(ingest_resumes(pending_files, max_in_flight=MAX_IN_FLIGHT, ocr_backend=ocr_backend, duplicates=duplicate_index, store=store, lease=lease)):
+            if error is not None:
+                st.error(f"Falha ao processar {filename}: {error}. As etapas concluídas foram salvas e as demais serão refeitas em segundo plano.")
+            elif result.get("duplicate_of"):
+                store.add_duplicate(result)
+                st.info(f"{filename} é uma duplicata de {result['duplicate_of']} ({result['reason']}) e não foi processado novamente.")
+            else:
+                store.add(result)
+
+            progress_bar.progress((i + 1) / num_files, text=f"{i + 1}/{num_files} currículos processados ({filename})")
+
+        sync_index(store, keyword_index)
+        sync_semantic_index(store, semantic_index, embedding_model)
+        sync_duplicate_index(store, duplicate_index)
+        st.success("Processamento concluído!")
 
 # Criar abas para diferentes funcionalidades
-tabs = st.tabs(["Resultados Executados", "Busca por Palavra-Chave", "Análise de Palavras-Chave", "Banco de Currículos", "Triagem Automática de Currículos"])
+tabs = st.tabs(["Resultados Executados", "Busca por Palavra-Chave", "Análise de Palavras-Chave", "Banco de Currículos", "Triagem Automática de Currículos", "Diagnóstico"])
 
 with tabs[0]:
-    display_results(st.session_state.results)
+    display_results(store)
 
 with tabs[1]:
-    display_search_results(st.session_state.results)
+    display_search_results(store, keyword_index)
 
 with tabs[2]:
-    display_job_analysis(st.session_state.results)
+    display_job_analysis(store, keyword_index, semantic_index)
 
 with tabs[3]:
-    display_resume_bank(st.session_state.curriculos_df)
+    display_resume_bank(store)
 
 with tabs[4]:
-    display_resume_triage(st.session_state.results)
+    display_resume_triage(store, keyword_index, semantic_index)
+
+with tabs[5]:
+    display_diagnostics(store)
@@ -0,0 +1,272 @@
+import bisect
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Limites (em segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Limites do histograma de chamadas remotas por currículo
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 10, 20)
+# Prefixo dos nomes das métricas exportadas
+METRIC_PREFIX = "analise_"
+
+
+class Histogram:
+    """
+    Histograma cumulativo no formato do Prometheus (contagem por limite superior, soma e total).
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """
+        Estima um quantil por interpolação linear dentro do intervalo que o contém.
+
+        Args:
+        q (float): Quantil entre 0 e 1.
+
+        Returns:
+        float or None: Valor estimado, ou None se não houver observações.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for position, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if position == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[position - 1] if position else 0.0
+                return lower + (self.buckets[position] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    Contadores e histogramas do processo, com rótulos, seguros para uso por várias threads.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def increment(self, name, value=1, **labels):
+        """
+        Soma um valor a um contador.
+
+        Args:
+        name (str): Nome da métrica (sem o prefixo).
+        value (float): Valor a ser somado.
+        **labels: Rótulos da série.
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        """
+        Registra uma observação em um histograma.
+
+        Args:
+        name (str): Nome da métrica (sem o prefixo).
+        value (float): Valor observado.
+        buckets (tuple): Limites do histograma, usados na primeira observação da série.
+        **labels: Rótulos da série.
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def reset(self):
+        """
+        Descarta todas as métricas coletadas.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """
+        Retorna uma cópia das métricas, pronta para serialização em JSON.
+
+        Returns:
+        dict: Listas de contadores e de histogramas, cada série com nome, rótulos e valores.
+        """
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": dict(zip([*map(str, histogram.buckets), "+Inf"], histogram.counts)),
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                }
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def to_json(self):
+        """
+        Returns:
+        str: Métricas em JSON.
+        """
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """
+        Returns:
+        str: Métricas no formato de texto de exposição do Prometheus.
+        """
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, (histogram.buckets, list(histogram.counts), histogram.sum, histogram.count))
+                                for key, histogram in self._histograms.items())
+        declared = set()
+        for (name, labels), value in counters:
+            metric = METRIC_PREFIX + name
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+        for (name, labels), (buckets, counts, total, count) in histograms:
+            metric = METRIC_PREFIX + name
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} histogram")
+                declared.add(metric)
+            cumulative = 0
+            for bound, bucket_count in zip([*map(str, buckets), "+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(f"{metric}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+# Métricas do processo, compartilhadas por todas as sessões do Streamlit
+metrics = MetricsRegistry()
+
+# Chamadas remotas do currículo em processamento (ver `track_remote_calls`)
+_remote_calls = contextvars.ContextVar("remote_calls", default=None)
+
+
+@contextmanager
+def timed(stage, **labels):
+    """
+    Mede a duração de uma etapa (`stage_seconds`) e conta as falhas (`stage_errors_total`).
+    Pode ser usado como gerenciador de contexto ou, via `instrument`, como decorador.
+
+    Args:
+    stage (str): Nome da etapa.
+    **labels: Rótulos adicionais.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as error:
+        metrics.increment("stage_errors_total", stage=stage, error=type(error).__name__, **labels)
+        raise
+    finally:
+        metrics.observe("stage_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+
+def instrument(stage):
+    """
+    Decorador que mede cada chamada da função como a etapa informada (ver `timed`).
+
+    Args:
+    stage (str): Nome da etapa.
+
+    Returns:
+    callable: Decorador.
+    """
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return func(*args, **kwargs)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+    return decorator
+
+
+def record_cache(cache, hit):
+    """
+    Conta um acerto ou uma falta de cache (`cache_requests_total`).
+
+    Args:
+    cache (str): Nome do cache.
+    hit (bool): Se o valor foi encontrado no cache.
+    """
+    metrics.increment("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def record_remote_call(service, calls=1):
+    """
+    Conta chamadas a um serviço remoto (`remote_calls_total`), atribuindo-as
+    também ao currículo em processamento, se houver.
+
+    Args:
+    service (str): Nome do serviço (ex.: "documentai", "vertex_llm").
+    calls (int): Quantidade de chamadas.
+    """
+    metrics.increment("remote_calls_total", calls, service=service)
+    tracked = _remote_calls.get()
+    if tracked is not None:
+        tracked.extend([service] * calls)
+
+
+@contextmanager
+def track_remote_calls():
+    """
+    Acumula as chamadas remotas feitas dentro do bloco (inclusive em tarefas
+    submetidas com `contextvars.copy_context().run`) e registra o total no
+    histograma `remote_calls_per_resume` ao final.
+
+    Yields:
+    list: Serviços chamados, um item por chamada.
+    """
+    calls = []
+    token = _remote_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _remote_calls.reset(token)
+        metrics.observe("remote_calls_per_resume", len(calls), buckets=CALL_COUNT_BUCKETS)
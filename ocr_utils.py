@@ -0,0 +1,236 @@
+import os
+import time
+import uuid
+
+import streamlit as st
+
+from gcp_utils import (PROJECT_ID, document_cache_key, document_page_text, get_credentials, get_document_cache,
+                       get_documentai_client, merge_page_text, process_document, processor_name)
+from metrics_utils import record_cache, record_remote_call, timed
+from pdf_utils import extract_text_layer, pages_without_text
+from scheduler_utils import BULK, priority_lane, schedule
+
+# A partir desta quantidade de arquivos a ingestão usa o processamento em lote do Document AI
+OCR_BATCH_THRESHOLD = int(os.environ.get("OCR_BATCH_THRESHOLD", 50))
+OCR_BATCH_PREFIX = "analise-curriculos/batch"
+# Limite de documentos por requisição de lote
+OCR_BATCH_SIZE = 500
+
+
+class OcrBackend:
+    """
+    Interface dos backends de OCR usados na ingestão.
+
+    Backends com `batched = True` recebem todos os arquivos de uma vez em
+    `process_many`; os demais são chamados arquivo a arquivo em `process`.
+    PDFs já lidos pela ingestão (ver `pdf_utils.read_pdf`) são repassados para
+    não serem lidos de novo.
+    """
+
+    batched = False
+
+    def process(self, file_path, pdf=None):
+        """
+        Extrai o texto de um PDF.
+
+        Args:
+        file_path (str): Caminho do PDF.
+        pdf (tuple): Conteúdo e camada de texto já lidos, se houver.
+
+        Returns:
+        str: Texto extraído.
+        """
+        raise NotImplementedError
+
+    def process_many(self, file_paths, pdfs=None):
+        """
+        Extrai o texto de vários PDFs.
+
+        Args:
+        file_paths (list): Caminhos dos PDFs.
+        pdfs (dict): Caminho -> conteúdo e camada de texto já lidos, se houver.
+
+        Returns:
+        dict: Caminho -> texto extraído, ou a exceção que impediu a extração.
+        """
+        pdfs = pdfs or {}
+        texts = {}
+        for file_path in file_paths:
+            try:
+                texts[file_path] = self.process(file_path, pdfs.get(file_path))
+            except Exception as error:
+                texts[file_path] = error
+        return texts
+
+
+class OnlineOcrBackend(OcrBackend):
+    """
+    Uma requisição síncrona ao Document AI por PDF (ver `gcp_utils.process_document`).
+    """
+
+    def process(self, file_path, pdf=None):
+        return process_document(file_path, pdf)
+
+
+class BatchOcrBackend(OcrBackend):
+    """
+    Processamento em lote do Document AI: os PDFs que precisam de OCR são
+    enviados ao Cloud Storage, processados em uma única operação de longa
+    duração e os resultados são associados de volta a cada arquivo.
+    """
+
+    batched = True
+
+    def __init__(self, bucket=None, prefix=OCR_BATCH_PREFIX, batch_size=OCR_BATCH_SIZE,
+                 poll_interval=10, timeout=3600):
+        from google.cloud import storage
+
+        self.bucket = bucket or ocr_batch_bucket()
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.storage_client = storage.Client(project=PROJECT_ID, credentials=get_credentials())
+
+    def process(self, file_path, pdf=None):
+        text = self.process_many([file_path], {file_path: pdf} if pdf is not None else None)[file_path]
+        if isinstance(text, Exception):
+            raise text
+        return text
+
+    def process_many(self, file_paths, pdfs=None):
+        pdfs = pdfs or {}
+        texts = {}
+        pending = {}
+        document_cache = get_document_cache()
+        for file_path in file_paths:
+            # Cache e camada de texto local antes de qualquer chamada remota
+            pdf = pdfs.get(file_path)
+            if pdf is not None:
+                content, pages = pdf
+            else:
+                try:
+                    with open(file_path, "rb") as file:
+                        content = file.read()
+                except OSError as error:
+                    # Um PDF que não pode ser lido falha sozinho, sem interromper o lote
+                    texts[file_path] = error
+                    continue
+            cache_key = document_cache_key(content)
+            cached_text = document_cache.get(*cache_key)
+            record_cache("documento", cached_text is not None)
+            if cached_text is not None:
+                texts[file_path] = cached_text
+                continue
+            if pdf is None:
+                pages = extract_text_layer(content)
+            if pages is not None and not pages_without_text(pages):
+                texts[file_path] = merge_page_text(pages, {})
+                document_cache.put(*cache_key, texts[file_path])
+                continue
+            pending[file_path] = (cache_key, pages)
+
+        paths = list(pending)
+        for start in range(0, len(paths), self.batch_size):
+            for file_path, result in self._run_batch(paths[start:start + self.batch_size]).items():
+                if isinstance(result, Exception):
+                    texts[file_path] = result
+                    continue
+                cache_key, pages = pending[file_path]
+                texts[file_path] = merge_page_text(pages, result)
+                document_cache.put(*cache_key, texts[file_path])
+        return texts
+
+    def _run_batch(self, file_paths):
+        bucket = self.storage_client.bucket(self.bucket)
+        run_prefix = f"{self.prefix}/{uuid.uuid4().hex}"
+        uris = {}
+        for number, file_path in enumerate(file_paths):
+            blob = bucket.blob(f"{run_prefix}/input/{number}.pdf")
+            blob.upload_from_filename(file_path, content_type="application/pdf")
+            uris[f"gs://{self.bucket}/{blob.name}"] = file_path
+
+        request = {
+            "name": processor_name(),
+            "input_documents": {"gcs_documents": {"documents": [
+                {"gcs_uri": uri, "mime_type": "application/pdf"} for uri in uris
+            ]}},
+            "document_output_config": {"gcs_output_config": {"gcs_uri": f"gs://{self.bucket}/{run_prefix}/output/"}},
+        }
+        try:
+            with timed("documentai_lote"):
+                # O envio passa pelo escalonador (ritmo, cota e novas tentativas em 429/5xx), na
+                # fila de lote; a espera pela operação não ocupa uma vaga de chamada simultânea
+                with priority_lane(BULK):
+                    operation = schedule("documentai", get_documentai_client().batch_process_documents,
+                                         request=request)
+                record_remote_call("documentai_lote")
+                deadline = time.monotonic() + self.timeout
+                while not operation.done():
+                    if time.monotonic() > deadline:
+                        raise TimeoutError("O processamento em lote do Document AI excedeu o tempo limite.")
+                    time.sleep(self.poll_interval)
+                operation.result()
+
+            results = {}
+            for status in operation.metadata.individual_process_statuses:
+                file_path = uris.get(status.input_gcs_source)
+                if file_path is None:
+                    continue
+                if status.status.code != 0:
+                    results[file_path] = RuntimeError(status.status.message)
+                    continue
+                results[file_path] = self._read_output(status.output_gcs_destination)
+            for uri, file_path in uris.items():
+                results.setdefault(file_path, RuntimeError(f"O lote não retornou resultado para {uri}."))
+            return results
+        except Exception as error:
+            return {file_path: error for file_path in file_paths}
+        finally:
+            for blob in bucket.list_blobs(prefix=run_prefix):
+                blob.delete()
+
+    def _read_output(self, destination):
+        # A saída de um documento pode ser dividida em vários arquivos JSON (shards)
+        bucket_name, _, prefix = destination[len("gs://"):].partition("/")
+        from google.cloud import documentai_v1 as documentai
+
+        pages = {}
+        # A barra final impede que a saída ".../output/1" inclua a de ".../output/10", ".../output/11" etc.
+        for blob in self.storage_client.list_blobs(bucket_name, prefix=prefix.rstrip("/") + "/"):
+            if blob.name.endswith(".json"):
+                document = documentai.Document.from_json(blob.download_as_bytes(), ignore_unknown_fields=True)
+                pages.update(document_page_text(document))
+        return pages
+
+
+def ocr_batch_bucket():
+    """
+    Returns:
+    str or None: Bucket do Cloud Storage usado como entrada e saída do processamento
+    em lote (`DOCUMENTAI_GCS_BUCKET` no ambiente ou em st.secrets).
+    """
+    bucket = os.environ.get("DOCUMENTAI_GCS_BUCKET")
+    if bucket:
+        return bucket
+    try:
+        return st.secrets.get("DOCUMENTAI_GCS_BUCKET")
+    except FileNotFoundError:
+        # Sem arquivo de secrets (ex.: execução pela linha de comando)
+        return None
+
+
+def get_ocr_backend(num_files):
+    """
+    Escolhe o backend de OCR conforme o tamanho da ingestão.
+
+    Args:
+    num_files (int): Quantidade de arquivos a processar.
+
+    Returns:
+    OcrBackend: Backend em lote acima de `OCR_BATCH_THRESHOLD` arquivos (se houver
+    bucket configurado) ou o backend síncrono.
+    """
+    if num_files >= OCR_BATCH_THRESHOLD and ocr_batch_bucket():
+        return BatchOcrBackend()
+    return OnlineOcrBackend()
@@ -0,0 +1,58 @@
+import io
+import logging
+
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+
+logger = logging.getLogger(__name__)
+
+# Páginas com menos caracteres que isso são tratadas como digitalizadas (sem camada de texto)
+MIN_PAGE_CHARS = 20
+
+
+def extract_text_layer(content):
+    """
+    Extrai localmente a camada de texto de cada página de um PDF.
+
+    Args:
+    content (bytes): Conteúdo do PDF.
+
+    Returns:
+    list or None: Texto de cada página (vazio para páginas sem camada de texto),
+    ou None se o PDF não puder ser lido localmente.
+    """
+    try:
+        reader = PdfReader(io.BytesIO(content))
+        return [page.extract_text() or "" for page in reader.pages]
+    except (PyPdfError, ValueError, KeyError, TypeError) as error:
+        logger.warning("Não foi possível ler a camada de texto do PDF: %s", error)
+        return None
+
+
+def read_pdf(file_path):
+    """
+    Lê um PDF do disco e extrai sua camada de texto, para que o arquivo seja
+    lido uma única vez pelas etapas que precisam dele.
+
+    Args:
+    file_path (str): Caminho do PDF.
+
+    Returns:
+    tuple: Conteúdo do PDF e texto de cada página (ver `extract_text_layer`).
+    """
+    with open(file_path, "rb") as file:
+        content = file.read()
+    return content, extract_text_layer(content)
+
+
+def pages_without_text(pages):
+    """
+    Identifica as páginas que precisam de OCR.
+
+    Args:
+    pages (list): Texto de cada página.
+
+    Returns:
+    list: Números das páginas (a partir de 1) sem camada de texto suficiente.
+    """
+    return [number for number, text in enumerate(pages, start=1) if len(text.strip()) < MIN_PAGE_CHARS]
@@ -1,28 +1,89 @@
-import re
+import json
 from gcp_utils import extract_keywords_from_description
 
-def extract_contact_info(text):
+NAME_QUESTION = 'Qual o nome completo do candidato? Me responda apenas o nome completo.'
+EXPERIENCE_QUESTION = "Qual o tempo de experiência desse candidato? Me diga apenas o número em anos."
+STRUCTURED_QUESTION = (
+    'Extraia do currículo o nome completo do candidato, todas as palavras-chave técnicas e o tempo de experiência em anos. '
+    'Responda somente com um JSON válido, sem comentários, no formato: '
+    '{"nome": "nome completo", "palavras_chave": ["palavra1", "palavra2"], "tempo_experiencia": "número de anos"}'
+)
+
+def _parse_json_answer(answer):
+    """
+    Converte a resposta do modelo em um dicionário, ignorando blocos de código e texto ao redor.
+
+    Args:
+    answer (str): Resposta do modelo de linguagem.
+
+    Returns:
+    dict: Campos retornados pelo modelo (vazio se a resposta não for um JSON válido).
+    """
+    start = answer.find("{")
+    end = answer.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(answer[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def _validate_name(value):
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return None
+
+def _validate_keywords(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        return None
+    keywords = [str(kw).replace('(', '').replace(')', '').strip() for kw in value if isinstance(kw, (str, int, float))]
+    keywords = [kw for kw in keywords if kw]
+    return keywords or None
+
+def _validate_experience(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return None
+
+# Campo do resultado -> (chave no JSON, validador, pergunta individual usada como fallback)
+STRUCTURED_FIELDS = {
+    "name": ("nome", _validate_name, lambda text: extract_keywords_from_description(description=text, pergunta=NAME_QUESTION, key_word=False, prompt_name="nome")),
+    "keywords": ("palavras_chave", _validate_keywords, lambda text: extract_keywords_from_description(description=text)),
+    "experience": ("tempo_experiencia", _validate_experience, lambda text: extract_keywords_from_description(description=text, pergunta=EXPERIENCE_QUESTION, key_word=False, prompt_name="experiencia")),
+}
+
+def extract_structured_info(text, fields=None):
     """
-    Extrai nome completo, telefone, email e LinkedIn do texto.
+    Extrai nome, palavras-chave técnicas e tempo de experiência com uma única chamada ao modelo.
+
+    A resposta em JSON é validada campo a campo; apenas os campos inválidos ou
+    ausentes são consultados novamente com as perguntas individuais. Quando
+    apenas um campo é pedido, a pergunta individual é feita diretamente.
 
     Args:
     text (str): Texto extraído do documento.
+    fields (iterable): Campos a extrair (padrão: todos de `STRUCTURED_FIELDS`).
 
     Returns:
-    tuple: Nome, telefones, emails e links do LinkedIn.
+    dict: Dicionário com os campos pedidos ("name", "keywords" e/ou "experience").
     """
-    # Regex para email
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    emails = re.findall(email_pattern, text)
-    
-    # Regex para telefone (formatos comuns no Brasil)
-    phone_pattern = r'\(?\d{2}\)?\s?\d{4,5}[-.\s]?\d{4}'
-    phones = re.findall(phone_pattern, text)
-    
-    # Regex para LinkedIn
-    linkedin_pattern = r'https?://(www\.)?linkedin\.com/in/[a-zA-Z0-9-_/]+'
-    linkedin_links = re.findall(linkedin_pattern, text)
-    
-    # Nome completo (heurística: primeira linha do currículo)
-    name = extract_keywords_from_description(description=text, pergunta='Qual o nome completo do candidato? Me responda apenas o nome completo.', key_word=False)
-    return name, phones, emails, linkedin_links
+    fields = list(fields or STRUCTURED_FIELDS)
+    if len(fields) == 1:
+        data = {}
+    else:
+        answer = extract_keywords_from_description(description=text, pergunta=STRUCTURED_QUESTION, key_word=False, prompt_name="estruturado")
+        data = _parse_json_answer(answer)
+
+    values = {}
+    for field in fields:
+        json_key, validate, fallback = STRUCTURED_FIELDS[field]
+        value = validate(data.get(json_key))
+        values[field] = value if value is not None else fallback(text)
+    return values
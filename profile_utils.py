@@ -0,0 +1,168 @@
+import re
+
+from index_utils import normalize_text, tokenize
+
+# Vocabulário canônico de habilidades: nome exibido -> formas em que aparece nos currículos
+SKILL_ALIASES = {
+    "Python": ("python", "python3", "python 3"),
+    "SQL": ("sql", "linguagem sql"),
+    "Power BI": ("power bi", "powerbi", "pbi"),
+    "Excel": ("excel", "microsoft excel", "ms excel", "excel avancado"),
+    "Java": ("java",),
+    "JavaScript": ("javascript", "js", "ecmascript"),
+    "TypeScript": ("typescript", "ts"),
+    "React": ("react", "react.js", "reactjs"),
+    "Angular": ("angular", "angularjs", "angular.js"),
+    "Node.js": ("node.js", "nodejs", "node"),
+    "C#": ("c#", "csharp", "c sharp"),
+    ".NET": (".net", "dotnet", "dot net", ".net core", "asp.net"),
+    "PHP": ("php",),
+    "HTML": ("html", "html5"),
+    "CSS": ("css", "css3"),
+    "AWS": ("aws", "amazon web services"),
+    "Azure": ("azure", "microsoft azure"),
+    "GCP": ("gcp", "google cloud", "google cloud platform"),
+    "Docker": ("docker",),
+    "Kubernetes": ("kubernetes", "k8s"),
+    "Linux": ("linux",),
+    "Git": ("git", "github", "gitlab"),
+    "CI/CD": ("ci/cd", "ci cd", "integracao continua"),
+    "Scrum": ("scrum",),
+    "Kanban": ("kanban",),
+    "Jira": ("jira",),
+    "Pandas": ("pandas",),
+    "Spark": ("spark", "apache spark", "pyspark"),
+    "ETL": ("etl",),
+    "Tableau": ("tableau",),
+    "SAP": ("sap",),
+    "Oracle": ("oracle", "oracle database"),
+    "MySQL": ("mysql",),
+    "PostgreSQL": ("postgresql", "postgres"),
+    "SQL Server": ("sql server", "mssql", "microsoft sql server"),
+    "MongoDB": ("mongodb", "mongo"),
+    "API REST": ("api rest", "rest", "restful", "rest api", "apis rest"),
+    "Machine Learning": ("machine learning", "ml", "aprendizado de maquina"),
+}
+
+# Forma normalizada (tokens de `index_utils.tokenize`) -> nome canônico
+_SKILL_LOOKUP = {
+    " ".join(tokenize(alias)): skill
+    for skill, aliases in SKILL_ALIASES.items()
+    for alias in (skill, *aliases)
+}
+
+# Faixas de experiência exibidas no banco de currículos: (rótulo, mínimo inclusivo em anos)
+EXPERIENCE_BUCKETS = (("0-1 ano", 0), ("1-3 anos", 1), ("3-5 anos", 3), ("5-10 anos", 5), ("10+ anos", 10))
+UNKNOWN_EXPERIENCE = "não informado"
+# Valores acima deste limite são tratados como ano (ex.: "2015") ou erro do modelo, não como experiência
+MAX_EXPERIENCE_YEARS = 60
+
+# Quantidade seguida (opcionalmente) da unidade, ex.: "5 anos", "2,5", "dois anos", "6 meses"
+_NUMBER_WORDS = {"um": 1, "uma": 1, "dois": 2, "duas": 2, "tres": 3, "quatro": 4, "cinco": 5, "seis": 6,
+                 "sete": 7, "oito": 8, "nove": 9, "dez": 10, "onze": 11, "doze": 12, "meio": 0.5}
+EXPERIENCE_PATTERN = re.compile(
+    rf"(\d+(?:[.,]\d+)?|\b(?:{'|'.join(_NUMBER_WORDS)})\b)\s*(anos?|years?|meses|mes|months?)?"
+)
+NO_EXPERIENCE_PATTERN = re.compile(r"\b(?:sem experiencia|nenhuma|nenhum|no experience)\b")
+
+
+def canonical_skill(keyword):
+    """
+    Converte uma palavra-chave extraída pelo LLM no nome canônico da habilidade.
+
+    Args:
+    keyword (str): Palavra-chave, ex.: "python3" ou "PowerBI".
+
+    Returns:
+    str or None: Nome do vocabulário (ex.: "Python"); para termos fora do
+    vocabulário, a forma normalizada (minúsculas, sem acentos); None se não
+    houver texto.
+    """
+    key = " ".join(tokenize(keyword or ""))
+    if not key:
+        return None
+    return _SKILL_LOOKUP.get(key) or _SKILL_LOOKUP.get(key.replace(" ", "")) or key
+
+
+def canonical_skills(keywords):
+    """
+    Args:
+    keywords (list): Palavras-chave extraídas pelo LLM.
+
+    Returns:
+    list: Habilidades canônicas, sem repetições, na ordem em que aparecem.
+    """
+    skills = (canonical_skill(keyword) for keyword in keywords or ())
+    return list(dict.fromkeys(skill for skill in skills if skill))
+
+
+def normalize_experience(experience):
+    """
+    Converte o tempo de experiência (texto livre do LLM) em anos. Meses são
+    somados como fração de ano ("2 anos e 6 meses" -> 2.5); sem unidade, o
+    número é lido como anos e, em intervalos, vale o limite inferior. Números
+    por extenso só contam seguidos da unidade ("uma experiência de 8 anos" -> 8).
+
+    Args:
+    experience (str): Tempo de experiência, ex.: "5 anos".
+
+    Returns:
+    float or None: Quantidade de anos, ou None se o texto não informar um valor plausível.
+    """
+    text = normalize_text(str(experience or ""))
+    if NO_EXPERIENCE_PATTERN.search(text):
+        return 0.0
+    # Apenas o primeiro valor em anos e o primeiro em meses contam: em "5 a 7 anos"
+    # vale o limite inferior e em "5 anos (desde 2019)" o ano é ignorado
+    years = months = None
+    for number, unit in EXPERIENCE_PATTERN.findall(text):
+        value = _NUMBER_WORDS.get(number)
+        if value is None:
+            value = float(number.replace(",", "."))
+        elif not unit and not (number == "meio" and years is not None):
+            # Sem unidade, "um"/"uma" e afins costumam ser artigos, não quantidades
+            continue
+        if unit.startswith(("mes", "month")):
+            if months is None:
+                months = value
+        elif number == "meio" and years is not None:
+            years += value  # "1 ano e meio"
+        elif years is None:
+            years = value
+    if years is None and months is None:
+        return None
+    total = (years or 0.0) + (months or 0.0) / 12
+    if total > MAX_EXPERIENCE_YEARS:
+        return None
+    return round(total, 2)
+
+
+def experience_bucket(years):
+    """
+    Args:
+    years (float or None): Experiência em anos.
+
+    Returns:
+    str: Rótulo da faixa de `EXPERIENCE_BUCKETS` (ou `UNKNOWN_EXPERIENCE`).
+    """
+    if years is None:
+        return UNKNOWN_EXPERIENCE
+    label = EXPERIENCE_BUCKETS[0][0]
+    for name, minimum in EXPERIENCE_BUCKETS:
+        if years >= minimum:
+            label = name
+    return label
+
+
+def build_profile(keywords, experience):
+    """
+    Monta o perfil normalizado de um candidato, gravado junto com o currículo.
+
+    Args:
+    keywords (list): Palavras-chave extraídas pelo LLM.
+    experience (str): Tempo de experiência extraído pelo LLM.
+
+    Returns:
+    dict: Habilidades canônicas (`skills`) e experiência em anos (`experience_years`).
+    """
+    return {"skills": canonical_skills(keywords), "experience_years": normalize_experience(experience)}
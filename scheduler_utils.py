@@ -0,0 +1,246 @@
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics_utils import metrics
+
+# Filas de prioridade: consultas feitas pela interface passam à frente da ingestão em lote
+INTERACTIVE = 0
+BULK = 1
+LANE_NAMES = {INTERACTIVE: "interativa", BULK: "lote"}
+
+# Novas tentativas e espera base (em segundos) após uma resposta 429/5xx
+SCHEDULER_MAX_RETRIES = int(os.environ.get("SCHEDULER_MAX_RETRIES", 4))
+SCHEDULER_BACKOFF = float(os.environ.get("SCHEDULER_BACKOFF", 1.0))
+# Vagas reservadas à fila interativa, que a ingestão em lote não pode ocupar
+INTERACTIVE_RESERVE = int(os.environ.get("SCHEDULER_INTERACTIVE_RESERVE", 1))
+
+# Cotas por serviço: requisições por minuto e chamadas simultâneas
+SERVICE_LIMITS = {
+    "documentai": (
+        float(os.environ.get("DOCUMENTAI_RATE_LIMIT", 120)),
+        int(os.environ.get("DOCUMENTAI_MAX_CONCURRENCY", 8)),
+    ),
+    "vertex_llm": (
+        float(os.environ.get("VERTEX_LLM_RATE_LIMIT", 60)),
+        int(os.environ.get("VERTEX_LLM_MAX_CONCURRENCY", 8)),
+    ),
+    "vertex_embedding": (
+        float(os.environ.get("VERTEX_EMBEDDING_RATE_LIMIT", 600)),
+        int(os.environ.get("VERTEX_EMBEDDING_MAX_CONCURRENCY", 8)),
+    ),
+}
+
+# Fila das chamadas feitas no contexto atual (ver `priority_lane`)
+_lane = contextvars.ContextVar("scheduler_lane", default=INTERACTIVE)
+
+
+@contextmanager
+def priority_lane(lane):
+    """
+    Define a fila das chamadas remotas feitas dentro do bloco (inclusive em
+    tarefas submetidas com `contextvars.copy_context().run`).
+
+    Args:
+    lane (int): `INTERACTIVE` ou `BULK`.
+    """
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def is_throttling_error(error):
+    """
+    Indica se o erro é uma resposta de cota excedida (429) ou de indisponibilidade
+    do serviço (5xx), que deve reduzir o ritmo das chamadas e ser repetida.
+    As exceções do google.api_core expõem o código HTTP em `code`.
+
+    Args:
+    error (Exception): Erro levantado pela chamada.
+
+    Returns:
+    bool: Se o erro indica sobrecarga do serviço.
+    """
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and (code == 429 or 500 <= code < 600)
+
+
+class TokenBucket:
+    """
+    Balde de fichas: comporta até `capacity` chamadas em rajada e é reabastecido
+    continuamente a `rate` fichas por segundo. Não é protegido por trava; o
+    `ServiceScheduler` o usa sob a sua.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """
+        Returns:
+        float: Segundos até haver uma ficha disponível (0 se já houver).
+        """
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+    def drain(self):
+        """
+        Descarta as fichas acumuladas, para que as próximas chamadas sigam o
+        ritmo de reabastecimento em vez de sair em rajada.
+        """
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class ServiceScheduler:
+    """
+    Controla as chamadas a um serviço remoto: limita o ritmo com um balde de
+    fichas, ajusta a quantidade de chamadas simultâneas conforme as respostas
+    (metade a cada 429/5xx, uma a mais a cada `limit` sucessos, até `max_concurrency`)
+    e atende primeiro a fila interativa. Chamadas recusadas por sobrecarga
+    são repetidas com backoff exponencial.
+    """
+
+    def __init__(self, service, rate_per_minute, max_concurrency, min_concurrency=1,
+                 max_retries=SCHEDULER_MAX_RETRIES, backoff=SCHEDULER_BACKOFF, interactive_reserve=INTERACTIVE_RESERVE):
+        self.service = service
+        self.bucket = TokenBucket(rate_per_minute / 60, capacity=max(1.0, min(rate_per_minute / 60, max_concurrency)))
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.interactive_reserve = interactive_reserve
+        self.active = 0
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _has_slot(self, lane):
+        limit = max(self.min_concurrency, int(self.limit))
+        if lane != INTERACTIVE and limit > self.interactive_reserve:
+            limit -= self.interactive_reserve
+        return self.active < limit
+
+    def _acquire(self, lane):
+        entry = (lane, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    delay = None
+                    if self._waiting[0] == entry and self._has_slot(lane):
+                        delay = self.bucket.wait_time()
+                        if delay <= 0:
+                            self.bucket.take()
+                            heapq.heappop(self._waiting)
+                            self.active += 1
+                            # O próximo da fila pode ter vaga e ficha disponíveis
+                            self._condition.notify_all()
+                            return
+                    self._condition.wait(delay)
+            except BaseException:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+                raise
+
+    def _release(self, throttled):
+        with self._condition:
+            self.active -= 1
+            if throttled:
+                self.limit = max(float(self.min_concurrency), self.limit / 2)
+                self.bucket.drain()
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def call(self, func, *args, **kwargs):
+        """
+        Executa uma chamada ao serviço respeitando o ritmo, a concorrência e a
+        prioridade da fila do contexto atual (ver `priority_lane`).
+
+        Args:
+        func (callable): Função que faz a chamada remota.
+
+        Returns:
+        object: Retorno da função.
+        """
+        lane = _lane.get()
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            self._acquire(lane)
+            metrics.observe("scheduler_wait_seconds", time.perf_counter() - start,
+                            service=self.service, lane=LANE_NAMES[lane])
+            try:
+                result = func(*args, **kwargs)
+            except Exception as error:
+                throttled = is_throttling_error(error)
+                self._release(throttled)
+                if not throttled:
+                    raise
+                metrics.increment("scheduler_throttled_total", service=self.service, code=error.code)
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+            else:
+                self._release(False)
+                return result
+
+    def status(self):
+        """
+        Returns:
+        dict: Limite atual de chamadas simultâneas, chamadas em andamento, em espera e fichas disponíveis.
+        """
+        with self._condition:
+            self.bucket.wait_time()
+            return {
+                "servico": self.service,
+                "limite_simultaneas": round(self.limit, 2),
+                "em_andamento": self.active,
+                "interativas_em_espera": sum(1 for lane, _ in self._waiting if lane == INTERACTIVE),
+                "lote_em_espera": sum(1 for lane, _ in self._waiting if lane != INTERACTIVE),
+                "fichas": round(max(self.bucket.tokens, 0.0), 2),
+            }
+
+
+# Um escalonador por serviço, compartilhado por todas as sessões e threads do processo
+schedulers = {
+    service: ServiceScheduler(service, rate_per_minute, max_concurrency)
+    for service, (rate_per_minute, max_concurrency) in SERVICE_LIMITS.items()
+}
+
+
+def schedule(service, func, *args, **kwargs):
+    """
+    Executa uma chamada remota pelo escalonador do serviço (ver `ServiceScheduler.call`).
+
+    Args:
+    service (str): Nome do serviço ("documentai", "vertex_llm" ou "vertex_embedding").
+    func (callable): Função que faz a chamada remota.
+
+    Returns:
+    object: Retorno da função.
+    """
+    return schedulers[service].call(func, *args, **kwargs)
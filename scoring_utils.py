@@ -0,0 +1,108 @@
+import numpy as np
+
+from index_utils import keyword_variants
+from metrics_utils import instrument, timed
+
+def parse_keyword_query(query):
+    """
+    Interpreta a consulta de palavras-chave digitada pelo usuário.
+
+    Cada termo separado por vírgula pode ter um peso (`python:3`) e ser marcado
+    como obrigatório com `+` (`+python`).
+
+    Args:
+    query (str): Consulta, ex.: "+python:3, sql, power bi".
+
+    Returns:
+    tuple: Palavras-chave (em minúsculas), dicionário de pesos e conjunto de palavras-chave obrigatórias.
+    """
+    keywords, weights, required = [], {}, set()
+    for term in query.split(","):
+        term = term.strip().lower()
+        is_required = term.startswith("+")
+        term = term.lstrip("+").strip()
+        weight = 1.0
+        name, separator, raw_weight = term.rpartition(":")
+        if separator:
+            try:
+                weight = float(raw_weight.replace(",", "."))
+                term = name.strip()
+            except ValueError:
+                pass
+        if not term or term in weights:
+            continue
+        keywords.append(term)
+        weights[term] = weight
+        if is_required:
+            required.add(term)
+    return keywords, weights, required
+
+
+@instrument("pontuacao")
+def score_resumes(store, index, keywords, weights=None, required=(), min_years=None,
+                  top_k=None, include_unmatched=False):
+    """
+    Pontua os currículos contra uma consulta de palavras-chave com operações vetorizadas.
+
+    A consulta vira uma matriz esparsa currículos x palavras-chave (em formato
+    de coordenadas), montada a partir das listas do índice invertido. A
+    pontuação é o produto dessa matriz pelo vetor de pesos, e os filtros de
+    termos obrigatórios e de experiência são máscaras sobre as linhas.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    index (KeywordIndex): Índice invertido dos currículos.
+    keywords (list): Palavras-chave da consulta.
+    weights (dict): Palavra-chave -> peso (padrão 1).
+    required (iterable): Palavras-chave que o currículo precisa conter.
+    min_years (float): Experiência mínima em anos.
+    top_k (int): Se informado, retorna apenas os k currículos de maior pontuação.
+    include_unmatched (bool): Se True, inclui também currículos sem nenhuma correspondência.
+
+    Returns:
+    list: Tuplas (pontuação, nome do arquivo), da maior para a menor pontuação;
+    empates mantêm a ordem de inclusão no banco.
+    """
+    weights = weights or {}
+    keywords = list(dict.fromkeys(keywords))
+    if min_years is not None:
+        # Anos de experiência normalizados na ingestão (None vira NaN e não passa no filtro)
+        rows = store.filename_experience_years()
+        filenames = [filename for filename, _ in rows]
+        years = np.asarray([years for _, years in rows], dtype=np.float64)
+    else:
+        filenames = store.filenames()
+    positions = {filename: row for row, filename in enumerate(filenames)}
+    num_docs = len(filenames)
+
+    # Coordenadas (currículo, palavra-chave) das correspondências
+    rows, cols = [], []
+    with timed("busca_palavras_chave"):
+        for col, keyword in enumerate(keywords):
+            matched = set()
+            for variant in keyword_variants(keyword):
+                matched |= index.lookup(variant)
+            matched_rows = [positions[doc_id] for doc_id in matched if doc_id in positions]
+            rows.extend(matched_rows)
+            cols.extend([col] * len(matched_rows))
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+
+    weight_vector = np.asarray([weights.get(keyword, 1.0) for keyword in keywords], dtype=np.float64)
+    scores = np.bincount(rows, weights=weight_vector[cols], minlength=num_docs) if len(rows) else np.zeros(num_docs)
+    hits = np.bincount(rows, minlength=num_docs)
+
+    mask = np.ones(num_docs, dtype=bool) if include_unmatched else hits > 0
+    required_cols = np.asarray([col for col, keyword in enumerate(keywords) if keyword in set(required)], dtype=np.int64)
+    if len(required_cols):
+        required_hits = np.bincount(rows[np.isin(cols, required_cols)], minlength=num_docs)
+        mask &= required_hits == len(required_cols)
+    if min_years is not None:
+        mask &= years >= min_years
+
+    candidates = np.flatnonzero(mask)
+    if top_k is not None and top_k < len(candidates):
+        # Seleção parcial: só os k melhores são ordenados
+        candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+    order = candidates[np.lexsort((candidates, -scores[candidates]))]
+    return [(float(scores[row]), filenames[row]) for row in order]
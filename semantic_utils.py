@@ -0,0 +1,256 @@
+import os
+import threading
+
+import numpy as np
+
+from cache_utils import TTLCache, sha256_bytes
+from metrics_utils import record_remote_call, timed
+from scheduler_utils import BULK, priority_lane, schedule
+
+# Backend de embeddings: "vertex" (Vertex AI) ou "local" (sentence-transformers, roda offline)
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "vertex")
+VERTEX_EMBEDDING_MODEL = os.environ.get("VERTEX_EMBEDDING_MODEL", "text-multilingual-embedding-002")
+LOCAL_EMBEDDING_MODEL = os.environ.get("LOCAL_EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+# Quantidade de candidatos exibidos no ranking semântico
+SEMANTIC_TOP_K = int(os.environ.get("SEMANTIC_TOP_K", 10))
+
+
+class EmbeddingBackend:
+    """
+    Interface dos backends de embeddings. `name` identifica o modelo, pois
+    vetores de modelos diferentes não são comparáveis.
+    """
+
+    name = None
+
+    def embed(self, texts):
+        """
+        Calcula os embeddings de uma lista de textos.
+
+        Args:
+        texts (list): Textos a serem convertidos.
+
+        Returns:
+        np.ndarray: Matriz (quantidade de textos x dimensão) em float32.
+        """
+        raise NotImplementedError
+
+
+class VertexEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeddings calculados pelo Vertex AI.
+    """
+
+    # Quantidade de textos por requisição ao modelo
+    batch_size = 5
+
+    def __init__(self, model_name=VERTEX_EMBEDDING_MODEL):
+        from gcp_utils import get_embedding_model
+
+        self.name = f"vertex:{model_name}"
+        self.model = get_embedding_model(model_name)
+
+    def embed(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            embeddings = schedule("vertex_embedding", self._embed_batch, texts[start:start + self.batch_size])
+            record_remote_call("vertex_embedding")
+            vectors.extend(embedding.values for embedding in embeddings)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _embed_batch(self, texts):
+        with timed("embedding"):
+            return self.model.get_embeddings(texts)
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeddings calculados localmente com sentence-transformers, sem acesso à rede
+    depois que o modelo foi baixado.
+    """
+
+    def __init__(self, model_name=LOCAL_EMBEDDING_MODEL):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as error:
+            raise ImportError(
+                "O backend local de embeddings requer o pacote sentence-transformers "
+                "(pip install sentence-transformers)."
+            ) from error
+
+        self.name = f"local:{model_name}"
+        self.model = SentenceTransformer(model_name)
+
+    def embed(self, texts):
+        return np.asarray(self.model.encode(list(texts)), dtype=np.float32)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def embedding_model_name():
+    """
+    Nome do modelo de embeddings configurado, no formato de `EmbeddingBackend.name`,
+    obtido da configuração sem criar o backend (nem carregar o modelo).
+
+    Returns:
+    str: Nome do modelo, ex.: "vertex:text-multilingual-embedding-002".
+    """
+    if EMBEDDING_BACKEND == "local":
+        return f"local:{LOCAL_EMBEDDING_MODEL}"
+    return f"vertex:{VERTEX_EMBEDDING_MODEL}"
+
+
+def get_embedding_backend():
+    """
+    Retorna o backend de embeddings configurado em `EMBEDDING_BACKEND`, criado uma única vez por processo.
+
+    Returns:
+    EmbeddingBackend: Backend de embeddings.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if EMBEDDING_BACKEND == "local":
+                _backend = LocalEmbeddingBackend()
+            else:
+                _backend = VertexEmbeddingBackend()
+        return _backend
+
+
+_query_cache = TTLCache(max_size=256, ttl=3600)
+
+
+def embed_query(text, backend=None):
+    """
+    Calcula (com memoização) o embedding de uma descrição de vaga.
+
+    Args:
+    text (str): Descrição da vaga.
+    backend (EmbeddingBackend): Backend de embeddings (padrão: o configurado).
+
+    Returns:
+    np.ndarray: Vetor do texto.
+    """
+    backend = backend or get_embedding_backend()
+    key = (backend.name, sha256_bytes(text.encode("utf-8")))
+    vector = _query_cache.get(key)
+    if vector is None:
+        vector = backend.embed([text])[0]
+        _query_cache.set(key, vector)
+    return vector
+
+
+class SemanticIndex:
+    """
+    Matriz de embeddings normalizados dos currículos, mantida em memória.
+    Uma descrição de vaga é ranqueada com um único produto matricial seguido de
+    seleção parcial dos k melhores.
+    """
+
+    def __init__(self):
+        self._filenames = []
+        self._positions = {}
+        self._matrix = None
+        self._size = 0
+        self._lock = threading.Lock()
+        # Último registro do banco de currículos já indexado (ver store_utils.sync_semantic_index)
+        self.synced_id = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, filename, vector):
+        """
+        Inclui (ou substitui) o embedding de um currículo.
+
+        Args:
+        filename (str): Nome do arquivo do currículo.
+        vector (np.ndarray): Embedding do currículo.
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        with self._lock:
+            position = self._positions.get(filename)
+            if position is not None:
+                self._matrix[position] = vector
+                return
+            if self._matrix is None:
+                self._matrix = np.empty((64, vector.shape[0]), dtype=np.float32)
+            elif self._size == self._matrix.shape[0]:
+                # Crescimento geométrico para manter a inclusão em O(1) amortizado
+                grown = np.empty((self._size * 2, self._matrix.shape[1]), dtype=np.float32)
+                grown[:self._size] = self._matrix
+                self._matrix = grown
+            self._matrix[self._size] = vector
+            self._positions[filename] = self._size
+            self._filenames.append(filename)
+            self._size += 1
+
+    def rank(self, query_vector, k=SEMANTIC_TOP_K):
+        """
+        Ranqueia os currículos pela similaridade de cosseno com um vetor de consulta.
+
+        Args:
+        query_vector (np.ndarray): Embedding da descrição da vaga.
+        k (int): Quantidade de currículos retornados.
+
+        Returns:
+        list: Tuplas (nome do arquivo, similaridade) da mais para a menos similar.
+        """
+        with self._lock:
+            if not self._size:
+                return []
+            matrix = self._matrix[:self._size]
+            filenames = self._filenames[:self._size]
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm > 0:
+            query_vector = query_vector / norm
+        scores = matrix @ query_vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(filenames[i], float(scores[i])) for i in top]
+
+
+def backfill_embeddings(store, backend=None, batch_size=32):
+    """
+    Calcula os embeddings dos currículos gravados antes da existência do ranking semântico.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    backend (EmbeddingBackend): Backend de embeddings (padrão: o configurado).
+    batch_size (int): Quantidade de currículos por chamada ao backend.
+
+    Returns:
+    int: Quantidade de currículos atualizados.
+    """
+    # O backend só é criado se houver o que calcular
+    missing = store.missing_embeddings(backend.name if backend else embedding_model_name())
+    if missing:
+        backend = backend or get_embedding_backend()
+    for start in range(0, len(missing), batch_size):
+        chunk = missing[start:start + batch_size]
+        with priority_lane(BULK):
+            vectors = backend.embed([text for _, text in chunk])
+        for (filename, _), vector in zip(chunk, vectors):
+            store.add_embedding(filename, backend.name, vector)
+    return len(missing)
+
+def embed_resume(text, backend=None):
+    """
+    Calcula o embedding do texto de um currículo.
+
+    Args:
+    text (str): Texto extraído do currículo.
+    backend (EmbeddingBackend): Backend de embeddings (padrão: o configurado).
+
+    Returns:
+    tuple: Nome do modelo e vetor do currículo.
+    """
+    backend = backend or get_embedding_backend()
+    return backend.name, backend.embed([text])[0]
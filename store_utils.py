@@ -0,0 +1,791 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from profile_utils import EXPERIENCE_BUCKETS, UNKNOWN_EXPERIENCE, build_profile, experience_bucket
+
+# Banco de currículos compartilhado entre usuários e reinicializações
+DATA_DIR = os.environ.get("ANALISE_DATA_DIR", "data")
+RESUME_STORE_PATH = os.path.join(DATA_DIR, "curriculos.sqlite3")
+
+# Colunas exibidas no banco de currículos
+BANK_COLUMNS = ["Nome do Arquivo", "Nome Completo", "Telefone", "Email", "LinkedIn",
+                "Habilidades", "Anos de Experiência", "PDF Path"]
+
+# Ordenações do banco de currículos: nome -> cláusula ORDER BY
+PROFILE_SORTS = {
+    "inclusao": "id",
+    "mais_experiencia": "experience_years IS NULL, experience_years DESC, id",
+    "menos_experiencia": "experience_years IS NULL, experience_years, id",
+    "mais_habilidades": "json_array_length(skills) DESC, id",
+}
+# Facetas mantidas em `resume_facets`
+SKILL_FACET = "habilidade"
+EXPERIENCE_FACET = "experiencia"
+
+_LIST_FIELDS = ("phones", "emails", "linkedin_links", "keywords", "skills")
+_COLUMNS = ("id", "filename", "sha256", "path", "text", "name", "phones", "emails",
+            "linkedin_links", "keywords", "experience", "created_at", "experience_years", "skills")
+
+
+class ResumeStore:
+    """
+    Armazenamento persistente (SQLite) dos currículos processados.
+
+    Cada registro guarda o texto extraído, os dados de contato, as
+    palavras-chave e o tempo de experiência, além do perfil normalizado
+    (habilidades canônicas e anos de experiência). A contagem de currículos
+    por habilidade e por faixa de experiência é atualizada a cada gravação.
+    As consultas são paginadas para que as telas carreguem apenas os
+    currículos que vão exibir.
+    """
+
+    def __init__(self, path=RESUME_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resumes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    filename TEXT NOT NULL UNIQUE,
+                    sha256 TEXT,
+                    path TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    name TEXT,
+                    phones TEXT NOT NULL DEFAULT '[]',
+                    emails TEXT NOT NULL DEFAULT '[]',
+                    linkedin_links TEXT NOT NULL DEFAULT '[]',
+                    keywords TEXT NOT NULL DEFAULT '[]',
+                    experience TEXT,
+                    created_at REAL NOT NULL,
+                    experience_years REAL,
+                    skills TEXT
+                )
+                """
+            )
+            # Bancos criados antes do perfil normalizado recebem as novas colunas (preenchidas abaixo)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(resumes)")}
+            for column, definition in (("experience_years", "REAL"), ("skills", "TEXT")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE resumes ADD COLUMN {column} {definition}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_resumes_sha256 ON resumes (sha256)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_resumes_experience_years ON resumes (experience_years)")
+            # Habilidades de cada currículo, para filtrar por habilidade sem percorrer o banco
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resume_skills (
+                    skill TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    PRIMARY KEY (skill, filename)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_resume_skills_filename ON resume_skills (filename)")
+            # Quantidade de currículos por valor de cada faceta (habilidade e faixa de experiência)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resume_facets (
+                    facet TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (facet, value)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resume_embeddings (
+                    filename TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    vector BLOB NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resume_duplicates (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    filename TEXT NOT NULL UNIQUE,
+                    duplicate_of TEXT NOT NULL,
+                    reason TEXT,
+                    sha256 TEXT,
+                    path TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            # Estado das etapas dos currículos ainda não concluídos (removido quando o currículo é gravado).
+            # A reserva do currículo por uma ingestão em andamento (claimed_by e heartbeat) fica na linha do envio
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resume_stages (
+                    filename TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    value TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL,
+                    claimed_by TEXT,
+                    heartbeat REAL,
+                    PRIMARY KEY (filename, stage)
+                )
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(resume_stages)")}
+            for column, definition in (("claimed_by", "TEXT"), ("heartbeat", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE resume_stages ADD COLUMN {column} {definition}")
+            self._backfill_profiles(conn)
+
+    def _connect(self):
+        # Uma conexão por thread, pois conexões SQLite não devem ser compartilhadas entre threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_result(row):
+        result = dict(zip(_COLUMNS, row))
+        for field in _LIST_FIELDS:
+            result[field] = json.loads(result[field])
+        return result
+
+    @staticmethod
+    def _update_facets(conn, filename, skills, experience_years, delta):
+        # Soma (delta=1) ou retira (delta=-1) o currículo das contagens das facetas
+        if delta > 0:
+            conn.executemany("INSERT OR IGNORE INTO resume_skills (skill, filename) VALUES (?, ?)",
+                             [(skill, filename) for skill in skills])
+        else:
+            conn.execute("DELETE FROM resume_skills WHERE filename = ?", (filename,))
+        values = [(SKILL_FACET, skill) for skill in skills]
+        values.append((EXPERIENCE_FACET, experience_bucket(experience_years)))
+        conn.executemany(
+            "INSERT INTO resume_facets (facet, value, count) VALUES (?, ?, ?) "
+            "ON CONFLICT (facet, value) DO UPDATE SET count = count + excluded.count",
+            [(facet, value, delta) for facet, value in values],
+        )
+        conn.execute("DELETE FROM resume_facets WHERE count <= 0")
+
+    def _backfill_profiles(self, conn):
+        # Currículos gravados antes do perfil normalizado
+        rows = conn.execute(
+            "SELECT filename, keywords, experience FROM resumes WHERE skills IS NULL ORDER BY id"
+        ).fetchall()
+        for filename, keywords, experience in rows:
+            profile = build_profile(json.loads(keywords), experience)
+            conn.execute(
+                "UPDATE resumes SET skills = ?, experience_years = ? WHERE filename = ?",
+                (json.dumps(profile["skills"]), profile["experience_years"], filename),
+            )
+            self._update_facets(conn, filename, profile["skills"], profile["experience_years"], 1)
+
+    def add(self, result):
+        """
+        Grava (ou substitui, pelo nome do arquivo) um currículo processado,
+        junto com seu embedding, se houver, e atualiza as facetas.
+
+        O perfil normalizado (`skills` e `experience_years`) é calculado a partir
+        das palavras-chave e do tempo de experiência quando não vem no resultado.
+
+        Args:
+        result (dict): Resultado do processamento do currículo.
+
+        Returns:
+        int: Identificador do registro gravado.
+        """
+        profile = build_profile(result.get("keywords", []), result.get("experience"))
+        profile.update((field, result[field]) for field in profile if result.get(field) is not None)
+        values = (
+            result["filename"], result.get("sha256"), result["path"], result["text"], result.get("name"),
+            json.dumps(result.get("phones", [])), json.dumps(result.get("emails", [])),
+            json.dumps(result.get("linkedin_links", [])), json.dumps(result.get("keywords", [])),
+            result.get("experience"), time.time(), profile["experience_years"], json.dumps(profile["skills"]),
+        )
+        conn = self._connect()
+        with conn:
+            previous = conn.execute(
+                "SELECT skills, experience_years FROM resumes WHERE filename = ?", (result["filename"],)
+            ).fetchone()
+            if previous is not None:
+                self._update_facets(conn, result["filename"], json.loads(previous[0] or "[]"), previous[1], -1)
+            cursor = conn.execute(
+                "INSERT OR REPLACE INTO resumes (filename, sha256, path, text, name, phones, emails, "
+                "linkedin_links, keywords, experience, created_at, experience_years, skills) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                values,
+            )
+            self._update_facets(conn, result["filename"], profile["skills"], profile["experience_years"], 1)
+            if result.get("embedding") is not None:
+                model, vector = result["embedding"]
+                self._write_embedding(conn, result["filename"], model, vector)
+            conn.execute("DELETE FROM resume_stages WHERE filename = ?", (result["filename"],))
+        return cursor.lastrowid
+
+    @staticmethod
+    def _write_embedding(conn, filename, model, vector):
+        conn.execute(
+            "INSERT OR REPLACE INTO resume_embeddings (filename, model, vector) VALUES (?, ?, ?)",
+            (filename, model, np.asarray(vector, dtype=np.float32).tobytes()),
+        )
+
+    def add_embedding(self, filename, model, vector):
+        """
+        Grava o embedding de um currículo.
+
+        Args:
+        filename (str): Nome do arquivo do currículo.
+        model (str): Nome do modelo que gerou o embedding.
+        vector (np.ndarray): Embedding do currículo.
+        """
+        conn = self._connect()
+        with conn:
+            self._write_embedding(conn, filename, model, vector)
+
+    def iter_embeddings(self, model, after_id=0):
+        """
+        Percorre os embeddings de um modelo gravados (ou regravados) após um identificador.
+
+        Args:
+        model (str): Nome do modelo de embeddings.
+        after_id (int): Último identificador de embedding já lido.
+
+        Yields:
+        tuple: Identificador do embedding, nome do arquivo e embedding.
+        """
+        rows = self._connect().execute(
+            "SELECT rowid, filename, vector FROM resume_embeddings WHERE rowid > ? AND model = ? ORDER BY rowid",
+            (after_id, model),
+        )
+        for row_id, filename, vector in rows:
+            yield row_id, filename, np.frombuffer(vector, dtype=np.float32)
+
+    def missing_embeddings(self, model):
+        """
+        Lista os currículos sem embedding para um modelo.
+
+        Args:
+        model (str): Nome do modelo de embeddings.
+
+        Returns:
+        list: Tuplas (nome do arquivo, texto extraído).
+        """
+        return self._connect().execute(
+            "SELECT r.filename, r.text FROM resumes r LEFT JOIN resume_embeddings e "
+            "ON e.filename = r.filename AND e.model = ? WHERE e.filename IS NULL ORDER BY r.id",
+            (model,),
+        ).fetchall()
+
+    def add_duplicate(self, result):
+        """
+        Registra um arquivo identificado como duplicata de um currículo do banco.
+        A duplicata fica vinculada ao original e não é listada separadamente.
+
+        Args:
+        result (dict): Nome do arquivo, caminho, SHA-256, original (`duplicate_of`) e motivo.
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO resume_duplicates (filename, duplicate_of, reason, sha256, path, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (result["filename"], result["duplicate_of"], result.get("reason"), result.get("sha256"),
+                 result["path"], time.time()),
+            )
+            conn.execute("DELETE FROM resume_stages WHERE filename = ?", (result["filename"],))
+
+    def save_stage(self, filename, stage, value=None, error=None):
+        """
+        Grava o resultado de uma etapa do processamento de um currículo.
+
+        Args:
+        filename (str): Nome do arquivo.
+        stage (str): Nome da etapa.
+        value (object): Resultado da etapa (serializável em JSON), quando concluída.
+        error (Exception): Erro da etapa, quando falhou.
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO resume_stages (filename, stage, status, value, error, attempts, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (filename, stage) DO UPDATE SET "
+                "status = excluded.status, value = excluded.value, error = excluded.error, "
+                "attempts = attempts + excluded.attempts, updated_at = excluded.updated_at",
+                (filename, stage, "erro" if error else "ok", None if error else json.dumps(value),
+                 f"{type(error).__name__}: {error}" if error else None, 1 if error else 0, time.time()),
+            )
+
+    def stage_state(self, filename):
+        """
+        Retorna o estado das etapas de um currículo ainda não concluído.
+
+        Args:
+        filename (str): Nome do arquivo.
+
+        Returns:
+        dict: Etapa -> dicionário com "status", "value", "error" e "attempts".
+        """
+        rows = self._connect().execute(
+            "SELECT stage, status, value, error, attempts FROM resume_stages WHERE filename = ?", (filename,)
+        )
+        return {
+            stage: {"status": status, "value": None if value is None else json.loads(value),
+                    "error": error, "attempts": attempts}
+            for stage, status, value, error, attempts in rows
+        }
+
+    def pending_jobs(self, max_attempts=None, lease_timeout=None):
+        """
+        Lista os currículos com processamento incompleto (interrompido ou com etapas que falharam).
+
+        Args:
+        max_attempts (int): Se informado, ignora os currículos com alguma etapa que já falhou esse número de vezes.
+        lease_timeout (float): Se informado, ignora os currículos reservados por uma ingestão
+        que renovou a reserva há menos desse número de segundos (ver `claim_jobs`).
+
+        Returns:
+        list: Tuplas (nome do arquivo, caminho do PDF), na ordem de envio.
+        """
+        query = "SELECT filename, value FROM resume_stages WHERE stage = 'upload' AND status = 'ok'"
+        params = []
+        if lease_timeout is not None:
+            query += " AND (claimed_by IS NULL OR heartbeat < ?)"
+            params.append(time.time() - lease_timeout)
+        if max_attempts is not None:
+            query += " AND filename NOT IN (SELECT filename FROM resume_stages WHERE status = 'erro' AND attempts >= ?)"
+            params.append(max_attempts)
+        rows = self._connect().execute(query + " ORDER BY updated_at", params)
+        return [(filename, json.loads(value)["path"]) for filename, value in rows]
+
+    def claim_jobs(self, jobs, owner, lease_timeout):
+        """
+        Reserva currículos para uma ingestão, registrando o envio dos que ainda não
+        têm estado. Currículos reservados por outra ingestão só são tomados se a
+        reserva não for renovada há `lease_timeout` segundos (processo interrompido).
+
+        Args:
+        jobs (list): Tuplas (nome do arquivo, resultado da etapa de envio).
+        owner (str): Identificador da ingestão.
+        lease_timeout (float): Segundos sem renovação após os quais uma reserva expira.
+
+        Returns:
+        set: Nomes dos arquivos reservados para `owner`.
+        """
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO resume_stages (filename, stage, status, value, attempts, updated_at, claimed_by, heartbeat) "
+                "VALUES (?, 'upload', 'ok', ?, 0, ?, ?, ?) ON CONFLICT (filename, stage) DO UPDATE SET "
+                "claimed_by = excluded.claimed_by, heartbeat = excluded.heartbeat "
+                "WHERE claimed_by IS NULL OR claimed_by = excluded.claimed_by OR heartbeat < ?",
+                [(filename, json.dumps(value), now, owner, now, now - lease_timeout) for filename, value in jobs],
+            )
+            rows = conn.execute(
+                "SELECT filename FROM resume_stages WHERE stage = 'upload' AND claimed_by = ?", (owner,)
+            ).fetchall()
+        return {filename for filename, in rows}
+
+    def renew_jobs(self, owner):
+        """
+        Renova a reserva dos currículos de uma ingestão em andamento.
+
+        Args:
+        owner (str): Identificador da ingestão.
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE resume_stages SET heartbeat = ? WHERE stage = 'upload' AND claimed_by = ?",
+                         (time.time(), owner))
+
+    def release_jobs(self, owner, filenames=None):
+        """
+        Libera a reserva de currículos, que voltam a ser retomados pelo reprocessamento.
+
+        Args:
+        owner (str): Identificador da ingestão.
+        filenames (list): Arquivos a liberar (None para todos os reservados por `owner`).
+        """
+        conn = self._connect()
+        with conn:
+            if filenames is None:
+                conn.execute("UPDATE resume_stages SET claimed_by = NULL, heartbeat = NULL "
+                             "WHERE stage = 'upload' AND claimed_by = ?", (owner,))
+            else:
+                conn.executemany("UPDATE resume_stages SET claimed_by = NULL, heartbeat = NULL "
+                                 "WHERE stage = 'upload' AND claimed_by = ? AND filename = ?",
+                                 [(owner, filename) for filename in filenames])
+
+    def stage_summary(self):
+        """
+        Returns:
+        list: Tuplas (nome do arquivo, etapa, situação, erro, tentativas) dos currículos não concluídos.
+        """
+        return self._connect().execute(
+            "SELECT filename, stage, status, error, attempts FROM resume_stages ORDER BY filename, updated_at"
+        ).fetchall()
+
+    def iter_duplicates(self, after_id=0):
+        """
+        Percorre as duplicatas registradas após um identificador.
+
+        Args:
+        after_id (int): Último identificador já lido.
+
+        Yields:
+        tuple: Identificador, nome do arquivo, original e SHA-256.
+        """
+        yield from self._connect().execute(
+            "SELECT id, filename, duplicate_of, sha256 FROM resume_duplicates WHERE id > ? ORDER BY id", (after_id,)
+        )
+
+    def count(self):
+        """
+        Returns:
+        int: Quantidade de currículos armazenados.
+        """
+        return self._connect().execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def has_filename(self, filename):
+        """
+        Verifica se um arquivo já foi processado (inclusive como duplicata).
+
+        Args:
+        filename (str): Nome do arquivo.
+
+        Returns:
+        bool: True se o arquivo já está no banco.
+        """
+        row = self._connect().execute(
+            "SELECT 1 FROM resumes WHERE filename = ? UNION ALL SELECT 1 FROM resume_duplicates WHERE filename = ?",
+            (filename, filename),
+        ).fetchone()
+        return row is not None
+
+    def find_sha256(self, sha256):
+        """
+        Procura um arquivo com o mesmo conteúdo já enviado: processado, vinculado
+        como duplicata ou ainda em processamento.
+
+        Args:
+        sha256 (str): SHA-256 do PDF.
+
+        Returns:
+        str or None: Nome com que o arquivo foi gravado, ou None se o conteúdo é novo.
+        """
+        row = self._connect().execute(
+            "SELECT filename FROM resumes WHERE sha256 = ? "
+            "UNION ALL SELECT filename FROM resume_duplicates WHERE sha256 = ? "
+            "UNION ALL SELECT filename FROM resume_stages WHERE stage = 'upload' AND json_extract(value, '$.sha256') = ?",
+            (sha256, sha256, sha256),
+        ).fetchone()
+        return row[0] if row else None
+
+    def unique_filename(self, filename, reserved=()):
+        """
+        Escolhe o nome com que um novo arquivo é gravado. Currículos diferentes
+        enviados com o mesmo nome (ex.: "CV.pdf") recebem um sufixo numérico
+        ("CV (2).pdf"), em vez de serem confundidos com o já existente.
+
+        Args:
+        filename (str): Nome do arquivo enviado.
+        reserved (set): Nomes já escolhidos para outros arquivos ainda não gravados no banco.
+
+        Returns:
+        str: Nome ainda não usado no banco nem em `reserved`.
+        """
+        stem, ext = os.path.splitext(filename)
+        candidate, number = filename, 1
+        while candidate in reserved or self.has_filename(candidate) or self._connect().execute(
+            "SELECT 1 FROM resume_stages WHERE filename = ?", (candidate,)
+        ).fetchone():
+            number += 1
+            candidate = f"{stem} ({number}){ext}"
+        return candidate
+
+    def reserve_upload(self, filename, directory, sha256, owner):
+        """
+        Escolhe o nome de um novo arquivo (ver `unique_filename`) e registra seu
+        envio, já reservado para uma ingestão, em uma única transação: outro
+        arquivo com o mesmo nome, na mesma sessão ou em outra, recebe outro nome.
+
+        Args:
+        filename (str): Nome do arquivo enviado.
+        directory (str): Diretório onde o PDF será gravado.
+        sha256 (str): SHA-256 do PDF.
+        owner (str): Identificador da ingestão (ver `claim_jobs`).
+
+        Returns:
+        str: Nome escolhido; o PDF deve ser gravado em "<directory>/<nome>".
+        """
+        conn = self._connect()
+        with conn:
+            # Trava de escrita desde a escolha do nome, para que duas sessões não escolham o mesmo
+            conn.execute("BEGIN IMMEDIATE")
+            name = self.unique_filename(filename)
+            now = time.time()
+            conn.execute(
+                "INSERT INTO resume_stages (filename, stage, status, value, attempts, updated_at, claimed_by, heartbeat) "
+                "VALUES (?, 'upload', 'ok', ?, 0, ?, ?, ?)",
+                (name, json.dumps({"path": f"{directory}/{name}", "sha256": sha256}), now, owner, now),
+            )
+        return name
+
+    def page(self, offset=0, limit=None):
+        """
+        Retorna uma página de currículos, na ordem de inclusão.
+
+        Args:
+        offset (int): Quantidade de registros a pular.
+        limit (int): Tamanho da página (None para todos os registros restantes).
+
+        Returns:
+        list: Lista de resultados.
+        """
+        rows = self._connect().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM resumes ORDER BY id LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset),
+        )
+        return [self._to_result(row) for row in rows]
+
+    def filenames(self):
+        """
+        Returns:
+        list: Nomes de todos os arquivos, na ordem de inclusão.
+        """
+        return [row[0] for row in self._connect().execute("SELECT filename FROM resumes ORDER BY id")]
+
+    def filename_experience_years(self):
+        """
+        Lê nomes e experiências em uma única consulta, para que as duas listas
+        correspondam ao mesmo estado do banco mesmo com inclusões simultâneas.
+
+        Returns:
+        list: Tuplas (nome do arquivo, experiência em anos ou None) de todos os
+        currículos, na ordem de inclusão.
+        """
+        return self._connect().execute("SELECT filename, experience_years FROM resumes ORDER BY id").fetchall()
+
+    def skill_facets(self):
+        """
+        Returns:
+        list: Tuplas (habilidade, quantidade de currículos), da mais frequente para a menos frequente.
+        """
+        return self._connect().execute(
+            "SELECT value, count FROM resume_facets WHERE facet = ? ORDER BY count DESC, value", (SKILL_FACET,)
+        ).fetchall()
+
+    def experience_facets(self):
+        """
+        Returns:
+        dict: Faixa de experiência -> quantidade de currículos, na ordem das faixas.
+        """
+        counts = dict(self._connect().execute(
+            "SELECT value, count FROM resume_facets WHERE facet = ?", (EXPERIENCE_FACET,)
+        ))
+        labels = [label for label, _ in EXPERIENCE_BUCKETS] + [UNKNOWN_EXPERIENCE]
+        return {label: counts.get(label, 0) for label in labels}
+
+    @staticmethod
+    def _profile_filter(skills, min_years):
+        # Cláusula WHERE (e parâmetros) dos filtros por habilidades e experiência mínima
+        skills = list(dict.fromkeys(skills))
+        conditions, params = [], []
+        if skills:
+            conditions.append(
+                f"filename IN (SELECT filename FROM resume_skills WHERE skill IN ({', '.join('?' * len(skills))}) "
+                "GROUP BY filename HAVING COUNT(*) = ?)"
+            )
+            params.extend([*skills, len(skills)])
+        if min_years is not None:
+            conditions.append("experience_years >= ?")
+            params.append(min_years)
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+    def count_profiles(self, skills=(), min_years=None):
+        """
+        Args:
+        skills (iterable): Habilidades que o currículo precisa ter (todas).
+        min_years (float): Experiência mínima em anos (None para não filtrar).
+
+        Returns:
+        int: Quantidade de currículos que atendem aos filtros.
+        """
+        where, params = self._profile_filter(skills, min_years)
+        return self._connect().execute(f"SELECT COUNT(*) FROM resumes {where}", params).fetchone()[0]
+
+    def search_profiles(self, skills=(), min_years=None, sort="inclusao", offset=0, limit=None):
+        """
+        Filtra os currículos pelas habilidades canônicas e pela experiência mínima.
+        O filtro de habilidades usa a tabela `resume_skills`, sem percorrer o banco.
+
+        Args:
+        skills (iterable): Habilidades que o currículo precisa ter (todas).
+        min_years (float): Experiência mínima em anos (None para não filtrar).
+        sort (str): Ordenação, uma das chaves de `PROFILE_SORTS`.
+        offset (int): Quantidade de registros a pular.
+        limit (int): Tamanho da página (None para todos os registros restantes).
+
+        Returns:
+        list: Página de resultados.
+        """
+        where, params = self._profile_filter(skills, min_years)
+        rows = self._connect().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM resumes {where} ORDER BY {PROFILE_SORTS[sort]} LIMIT ? OFFSET ?",
+            [*params, -1 if limit is None else limit, offset],
+        )
+        return [self._to_result(row) for row in rows]
+
+    def profile_paths(self, skills=(), min_years=None):
+        """
+        Args:
+        skills (iterable): Habilidades que o currículo precisa ter (todas).
+        min_years (float): Experiência mínima em anos (None para não filtrar).
+
+        Returns:
+        dict: Nome do arquivo -> caminho do PDF, para os currículos que atendem aos filtros.
+        """
+        where, params = self._profile_filter(skills, min_years)
+        return dict(self._connect().execute(f"SELECT filename, path FROM resumes {where} ORDER BY id", params))
+
+    def paths(self):
+        """
+        Returns:
+        dict: Nome do arquivo -> caminho do PDF, para todos os currículos.
+        """
+        return dict(self._connect().execute("SELECT filename, path FROM resumes ORDER BY id"))
+
+    def get_many(self, filenames):
+        """
+        Busca currículos pelo nome do arquivo.
+
+        Args:
+        filenames (iterable): Nomes dos arquivos.
+
+        Returns:
+        list: Lista de resultados, na ordem de inclusão.
+        """
+        filenames = list(filenames)
+        results = []
+        conn = self._connect()
+        # Consulta em blocos para respeitar o limite de parâmetros do SQLite
+        for start in range(0, len(filenames), 500):
+            chunk = filenames[start:start + 500]
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM resumes WHERE filename IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            results.extend(self._to_result(row) for row in rows)
+        results.sort(key=lambda result: result["id"])
+        return results
+
+    def iter_fingerprints(self, after_id=0):
+        """
+        Percorre o SHA-256 e o texto dos currículos gravados após um identificador.
+
+        Args:
+        after_id (int): Último identificador já lido.
+
+        Yields:
+        tuple: Identificador, nome do arquivo, SHA-256 e texto extraído.
+        """
+        yield from self._connect().execute(
+            "SELECT id, filename, sha256, text FROM resumes WHERE id > ? ORDER BY id", (after_id,)
+        )
+
+    def iter_texts(self, after_id=0):
+        """
+        Percorre os textos dos currículos gravados após um identificador.
+
+        Args:
+        after_id (int): Último identificador já lido.
+
+        Yields:
+        tuple: Identificador, nome do arquivo e texto extraído.
+        """
+        yield from self._connect().execute(
+            "SELECT id, filename, text FROM resumes WHERE id > ? ORDER BY id", (after_id,)
+        )
+
+
+def bank_dataframe(results):
+    """
+    Monta o DataFrame do banco de currículos a partir de resultados do banco.
+
+    Args:
+    results (list): Lista de resultados.
+
+    Returns:
+    pd.DataFrame: DataFrame com as colunas de `BANK_COLUMNS`.
+    """
+    rows = [
+        {
+            "Nome do Arquivo": result["filename"],
+            "Nome Completo": result["name"],
+            "Telefone": ", ".join(result["phones"]),
+            "Email": ", ".join(result["emails"]),
+            "LinkedIn": ", ".join(result["linkedin_links"]),
+            "Habilidades": ", ".join(result["skills"]),
+            "Anos de Experiência": result["experience_years"],
+            "PDF Path": result["path"]
+        }
+        for result in results
+    ]
+    return pd.DataFrame(rows, columns=BANK_COLUMNS)
+
+
+def sync_index(store, index):
+    """
+    Atualiza o índice invertido com os currículos gravados desde a última sincronização.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    index (KeywordIndex): Índice invertido dos currículos.
+    """
+    for row_id, filename, text in store.iter_texts(after_id=index.synced_id):
+        index.add(filename, text)
+        index.synced_id = row_id
+
+
+def sync_semantic_index(store, index, model):
+    """
+    Atualiza a matriz de embeddings com os currículos gravados desde a última sincronização.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    index (SemanticIndex): Índice semântico dos currículos.
+    model (str): Nome do modelo de embeddings em uso.
+    """
+    for row_id, filename, vector in store.iter_embeddings(model, after_id=index.synced_id):
+        index.add(filename, vector)
+        index.synced_id = row_id
+
+
+def sync_duplicate_index(store, index):
+    """
+    Atualiza o índice de duplicatas com os currículos e duplicatas gravados desde a última sincronização.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    index (DuplicateIndex): Índice de duplicatas.
+    """
+    for row_id, filename, sha256, text in store.iter_fingerprints(after_id=index.synced_id):
+        index.add(filename, sha256, text)
+        index.synced_id = row_id
+    # O SHA-256 de uma duplicata também aponta para o currículo original
+    for row_id, _, duplicate_of, sha256 in store.iter_duplicates(after_id=index.synced_duplicate_id):
+        index.add(duplicate_of, sha256)
+        index.synced_duplicate_id = row_id
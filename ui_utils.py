@@ -1,115 +1,293 @@
+import functools
+import math
+import os
 import streamlit as st
 import pandas as pd
-import io
-import zipfile
 from datetime import datetime
 from gcp_utils import extract_keywords_from_description
+from export_utils import build_zip, export_path, read_zip
+from ingestion_utils import STAGES, retry_pending
+from metrics_utils import metrics
+from semantic_utils import embed_query, get_embedding_backend, SEMANTIC_TOP_K
+from scoring_utils import parse_keyword_query, score_resumes
+from scheduler_utils import schedulers
+from store_utils import bank_dataframe
 
-def display_results(results):
+# Quantidade de currículos exibidos por página
+PAGE_SIZE_OPTIONS = (10, 25, 50, 100)
+DEFAULT_PAGE_SIZE = int(os.environ.get("UI_PAGE_SIZE", PAGE_SIZE_OPTIONS[0]))
+# Ordenações do banco de currículos (chaves de `store_utils.PROFILE_SORTS`)
+BANK_SORTS = {
+    "inclusao": "Ordem de inclusão",
+    "mais_experiencia": "Mais experiência",
+    "menos_experiencia": "Menos experiência",
+    "mais_habilidades": "Mais habilidades",
+}
+
+KEYWORD_QUERY_HELP = "Use palavra:peso para dar mais peso a um termo (ex.: python:3) e +palavra para torná-lo obrigatório."
+
+def load_page(store, scored_results, offset, limit):
+    """
+    Carrega do banco apenas os currículos de uma página de resultados.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    scored_results (list): Tuplas (pontuação, nome do arquivo).
+    offset (int): Posição inicial da página.
+    limit (int): Tamanho da página.
+
+    Returns:
+    list: Tuplas (pontuação, resultado) da página.
+    """
+    page = scored_results[offset:offset + limit]
+    results = {result["filename"]: result for result in store.get_many(filename for _, filename in page)}
+    return [(count, results[filename]) for count, filename in page if filename in results]
+
+def group_by_count(scored_results):
+    """
+    Agrupa resultados pela pontuação (quantidade de palavras-chave correspondentes, sem pesos).
+
+    Args:
+    scored_results (list): Tuplas (pontuação, item).
+
+    Returns:
+    dict: Pontuação -> lista de itens, da maior para a menor pontuação.
+    """
+    grouped_results = {}
+    for count, item in scored_results:
+        if count not in grouped_results:
+            grouped_results[count] = []
+        grouped_results[count].append(item)
+    return dict(sorted(grouped_results.items(), reverse=True))
+
+def score_label(score, weighted=False):
     """
-    Exibe os resultados dos currículos processados.
+    Monta o título de um grupo de currículos com a mesma pontuação.
+
+    Args:
+    score (float): Pontuação do grupo.
+    weighted (bool): Se a consulta usou pesos diferentes de 1.
+
+    Returns:
+    str: Título do grupo.
+    """
+    if weighted:
+        return f"Currículos com pontuação {score:g}:"
+    return f"Currículos com {score:g} palavras-chave correspondentes:"
+
+def paginate(total, key):
+    """
+    Exibe os controles de paginação e retorna a página selecionada.
+
+    Args:
+    total (int): Quantidade total de itens.
+    key (str): Prefixo das chaves dos controles no Streamlit.
+
+    Returns:
+    tuple: Posição inicial e tamanho da página.
+    """
+    options = sorted(set(PAGE_SIZE_OPTIONS) | {DEFAULT_PAGE_SIZE})
+    col_size, col_page = st.columns(2)
+    page_size = col_size.selectbox("Itens por página", options, index=options.index(DEFAULT_PAGE_SIZE), key=f"{key}_page_size")
+    num_pages = max(1, math.ceil(total / page_size))
+    page = col_page.number_input("Página", min_value=1, max_value=num_pages, value=1, step=1, key=f"{key}_page")
+    st.caption(f"Página {page} de {num_pages} ({total} currículos)")
+    return (page - 1) * page_size, page_size
+
+def display_result_expander(result, key, title=None):
+    """
+    Exibe o texto extraído de um currículo e os botões de download. O PDF só é
+    lido do disco para os currículos da página visível.
+
+    Args:
+    result (dict): Resultado do processamento do currículo.
+    key (str): Prefixo das chaves dos botões no Streamlit.
+    title (str): Título do expander.
+    """
+    with st.expander(title or f"Resultados para: {result['filename']}"):
+        st.write(result["text"])
+        st.download_button(
+            label="Baixar texto extraído",
+            data=result["text"],
+            file_name=f"{result['filename']}.txt",
+            key=f"{key}_text_{result['id']}"
+        )
+        with open(result["path"], "rb") as file:
+            st.download_button(
+                label="Baixar PDF original",
+                data=file,
+                file_name=result["filename"],
+                key=f"{key}_pdf_{result['id']}"
+            )
+
+def triage_dataframe(results):
+    """
+    Monta a tabela de triagem para os currículos de um grupo.
 
     Args:
     results (list): Lista de resultados processados.
+
+    Returns:
+    pd.DataFrame: Tabela com os dados de contato e o caminho do PDF.
+    """
+    group_df = pd.DataFrame([
+        {
+            "Nome do Arquivo": res["filename"],
+            "Nome Completo": res["name"],
+            "Telefone": ", ".join(res["phones"]),
+            "Email": ", ".join(res["emails"]),
+            "LinkedIn": ", ".join(res["linkedin_links"]),
+            "Palavras-Chave Técnica": ", ".join(res["keywords"]),
+            "Tempo Experiência": res["experience"],
+            "PDF Download": res["path"]
+        }
+        for res in results
+    ])
+    group_df['LinkedIn'] = group_df['LinkedIn'].apply(lambda x: f'<a href="{x}" target="_blank">{x}</a>' if x else '')
+    return group_df
+
+def zip_entries(store, scored_results):
+    """
+    Lista os PDFs de todos os resultados para o ZIP, agrupados pela quantidade de palavras-chave.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    scored_results (list): Tuplas (pontuação, nome do arquivo).
+
+    Returns:
+    list: Tuplas (caminho do PDF, nome dentro do ZIP).
+    """
+    paths = store.paths()
+    return [
+        (paths[filename], f"{count:g}_palavras_chave/{filename}")
+        for count, filename in scored_results
+        if filename in paths
+    ]
+
+def zip_download_button(label, entries, file_name, key, extra_files=None):
+    """
+    Exibe o botão de download de um ZIP gerado sob demanda.
+
+    O ZIP só é montado quando o usuário pede, e é reaproveitado enquanto a
+    seleção de currículos e os arquivos extras não mudarem. O conteúdo só é
+    lido do disco quando o botão de download é clicado, e não a cada interação.
+
+    Args:
+    label (str): Texto do botão de download.
+    entries (list): Tuplas (caminho do PDF, nome dentro do ZIP).
+    file_name (str): Nome do arquivo ZIP baixado.
+    key (str): Chave única dos botões no Streamlit.
+    extra_files (dict): Nome dentro do ZIP -> conteúdo em texto.
+    """
+    zip_path = export_path(entries, extra_files)
+    if not os.path.exists(zip_path):
+        if not st.button(f"Gerar ZIP: {label}", key=f"{key}_gerar"):
+            return
+        with st.spinner("Gerando arquivo ZIP..."):
+            build_zip(entries, extra_files)
+    st.download_button(
+        label=label,
+        data=functools.partial(read_zip, entries, extra_files),
+        file_name=file_name,
+        mime="application/zip",
+        key=key
+    )
+
+def display_semantic_ranking(store, semantic_index, job_description_text, key):
+    """
+    Exibe os currículos mais aderentes à descrição da vaga pela similaridade dos embeddings.
+    O ranking não é exibido se o backend de embeddings não puder ser criado (ex.:
+    backend local sem o pacote sentence-transformers).
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    semantic_index (SemanticIndex): Índice semântico dos currículos.
+    job_description_text (str): Descrição da vaga.
+    key (str): Prefixo das chaves dos controles no Streamlit.
+    """
+    if not len(semantic_index):
+        return
+    try:
+        backend = get_embedding_backend()
+    except Exception as error:
+        st.caption(f"Ranking semântico indisponível: {error}")
+        return
+    top_k = st.number_input("Quantidade de candidatos no ranking semântico", min_value=1,
+                            value=SEMANTIC_TOP_K, step=1, key=f"{key}_top_k")
+    ranking = semantic_index.rank(embed_query(job_description_text, backend), k=int(top_k))
+    results = {result["filename"]: result for result in store.get_many(filename for filename, _ in ranking)}
+    st.write("Currículos mais aderentes à descrição da vaga (similaridade semântica):")
+    st.dataframe(pd.DataFrame([
+        {
+            "Nome do Arquivo": filename,
+            "Nome Completo": results[filename]["name"],
+            "Similaridade": round(score, 3),
+            "Tempo Experiência": results[filename]["experience"]
+        }
+        for filename, score in ranking
+        if filename in results
+    ]), hide_index=True)
+
+def display_results(store):
+    """
+    Exibe os resultados dos currículos processados, uma página por vez.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
     """
     st.header("Resultados Executados")
-    if results:
-        for idx, result in enumerate(results):
-            with st.expander(f"Resultados para: {result['filename']}"):
-                st.write(result["text"])
-                st.download_button(
-                    label="Baixar texto extraído",
-                    data=result["text"],
-                    file_name=f"{result['filename']}.txt",
-                    key=f"download_text_{idx}"
-                )
-                with open(result["path"], "rb") as file:
-                    st.download_button(
-                        label="Baixar PDF original",
-                        data=file,
-                        file_name=result["filename"],
-                        key=f"download_pdf_{idx}"
-                    )
+    total = store.count()
+    if total:
+        offset, limit = paginate(total, "results")
+        for result in store.page(offset, limit):
+            display_result_expander(result, "download")
 
-def display_search_results(results):
+def display_search_results(store, index):
     """
     Exibe os resultados da busca por palavras-chave.
 
     Args:
-    results (list): Lista de resultados processados.
+    store (ResumeStore): Banco de currículos.
+    index (KeywordIndex): Índice invertido dos currículos.
     """
     st.header("Busca por Palavras-Chave")
-    keywords = st.text_input("Adicione palavras-chave separadas por vírgulas", key="search_keywords")
+    keywords = st.text_input("Adicione palavras-chave separadas por vírgulas", key="search_keywords",
+                             help=KEYWORD_QUERY_HELP)
 
     if keywords:
-        keywords = [keyword.strip().lower() for keyword in keywords.split(",")]
-        keywords_no_space = [keyword.replace(" ", "") for keyword in keywords]
-        
-        filtered_results = []
-        for result in results:
-            text = result["text"].lower()
-            matched_keywords = set()
-            for keyword in keywords + keywords_no_space:
-                if keyword in text:
-                    matched_keywords.add(keyword)
-            keyword_count = len(matched_keywords)
-            if keyword_count > 0:
-                filtered_results.append((keyword_count, result))
+        keywords, weights, required = parse_keyword_query(keywords)
+        weighted = any(weight != 1 for weight in weights.values())
+        filtered_results = score_resumes(store, index, keywords, weights=weights, required=required)
         
         if filtered_results:
             st.write("Currículos encontrados com as palavras-chave fornecidas:")
-            filtered_results.sort(reverse=True, key=lambda x: x[0])  # Ordenar por contagem de palavras-chave
-            grouped_results = {}
-            for count, result in filtered_results:
-                if count not in grouped_results:
-                    grouped_results[count] = []
-                grouped_results[count].append(result)
+            offset, limit = paginate(len(filtered_results), "search")
+            grouped_results = group_by_count(load_page(store, filtered_results, offset, limit))
             
-            for count in sorted(grouped_results.keys(), reverse=True):
-                st.write(f"Currículos com {count} palavras-chave correspondentes:")
-                for idx, result in enumerate(grouped_results[count]):
-                    with st.expander(f"Resultados para: {result['filename']}"):
-                        st.write(result["text"])
-                        st.download_button(
-                            label="Baixar texto extraído",
-                            data=result["text"],
-                            file_name=f"{result['filename']}.txt",
-                            key=f"filtered_download_text_{count}_{idx}"
-                        )
-                        with open(result["path"], "rb") as file:
-                            st.download_button(
-                                label="Baixar PDF original",
-                                data=file,
-                                file_name=result["filename"],
-                                key=f"filtered_download_pdf_{count}_{idx}"
-                            )
+            for count, results in grouped_results.items():
+                st.write(score_label(count, weighted))
+                for result in results:
+                    display_result_expander(result, "filtered_download")
             
             # Botão para baixar todos os resultados filtrados como ZIP
-            with io.BytesIO() as zip_buffer:
-                with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-                    for count, results in grouped_results.items():
-                        for result in results:
-                            pdf_path = result["path"]
-                            pdf_name = result["filename"]
-                            zip_file.write(pdf_path, f"{count}_palavras_chave/{pdf_name}")
-                    keywords_str = ", ".join(keywords)
-                    zip_file.writestr("palavras_chave.txt", keywords_str)
-                zip_buffer.seek(0)
-                st.download_button(
-                    label="Baixar todos os currículos filtrados",
-                    data=zip_buffer,
-                    file_name="curriculos_filtrados.zip",
-                    mime="application/zip"
-                )
+            zip_download_button(
+                label="Baixar todos os currículos filtrados",
+                entries=zip_entries(store, filtered_results),
+                file_name="curriculos_filtrados.zip",
+                key="search_zip",
+                extra_files={"palavras_chave.txt": ", ".join(keywords)}
+            )
         else:
             st.write("Nenhum currículo encontrado com as palavras-chave fornecidas.")
 
-def display_job_analysis(results):
+def display_job_analysis(store, index, semantic_index):
     """
     Exibe a análise de compatibilidade de currículos com a descrição da vaga.
 
     Args:
-    results (list): Lista de resultados processados.
+    store (ResumeStore): Banco de currículos.
+    index (KeywordIndex): Índice invertido dos currículos.
+    semantic_index (SemanticIndex): Índice semântico dos currículos.
     """
     st.header("Análise de Palavras-Chave e Comparação com Descrições de Vagas")
     
@@ -117,76 +295,81 @@ def display_job_analysis(results):
     
     if job_description_text:
         job_keywords = extract_keywords_from_description(job_description_text)
-        job_keywords_no_space = [keyword.replace(" ", "") for keyword in job_keywords]
     
         st.write("Palavras-chave técnicas extraídas da descrição da vaga:")
         st.write(", ".join(job_keywords))
         
-        if results:
+        if store.count():
+            display_semantic_ranking(store, semantic_index, job_description_text, "job_analysis")
             st.write("Análise de compatibilidade dos currículos com a descrição da vaga:")
-            compatibility_results = []
-            
-            for result in results:
-                text = result["text"].lower()
-                matched_keywords = set()
-                for keyword in job_keywords + job_keywords_no_space:
-                    if keyword in text:
-                        matched_keywords.add(keyword)
-                keyword_count = len(matched_keywords)
-                compatibility_results.append((keyword_count, result))
-            
-            compatibility_results.sort(reverse=True, key=lambda x: x[0])  # Ordenar por contagem de palavras-chave
-            for count, result in compatibility_results:
-                with st.expander(f"Resultados para: {result['filename']} (Compatibilidade: {count} palavras-chave)"):
-                    st.write(result["text"])
-                    st.download_button(
-                        label="Baixar texto extraído",
-                        data=result["text"],
-                        file_name=f"{result['filename']}.txt",
-                        key=f"compatibility_download_text_{result['filename']}"
-                    )
-                    with open(result["path"], "rb") as file:
-                        st.download_button(
-                            label="Baixar PDF original",
-                            data=file,
-                            file_name=result["filename"],
-                            key=f"compatibility_download_pdf_{result['filename']}"
-                        )
+            compatibility_results = score_resumes(store, index, job_keywords, include_unmatched=True)
+            offset, limit = paginate(len(compatibility_results), "compatibility")
+            for count, result in load_page(store, compatibility_results, offset, limit):
+                display_result_expander(
+                    result, "compatibility_download",
+                    title=f"Resultados para: {result['filename']} (Compatibilidade: {count:g} palavras-chave)"
+                )
 
-def display_resume_bank(df):
+def display_resume_bank(store):
     """
-    Exibe o banco de currículos com opção de download.
+    Exibe o banco de currículos com filtros por habilidades e experiência mínima,
+    ordenação e opção de download. As contagens de cada habilidade e faixa de
+    experiência vêm das facetas mantidas pelo banco, e a tabela HTML é montada
+    apenas para as linhas da página visível.
 
     Args:
-    df (pd.DataFrame): DataFrame contendo os currículos processados.
+    store (ResumeStore): Banco de currículos.
     """
     st.header("Banco de Currículos")
+    skill_counts = dict(store.skill_facets())
+    col_skills, col_years, col_sort = st.columns([3, 1, 1])
+    skills = col_skills.multiselect("Habilidades", list(skill_counts), key="bank_skills",
+                                    format_func=lambda skill: f"{skill} ({skill_counts[skill]})")
+    min_years = col_years.number_input("Experiência mínima (anos)", min_value=0, value=0, step=1, key="bank_min_years")
+    sort = col_sort.selectbox("Ordenar por", list(BANK_SORTS), format_func=BANK_SORTS.get, key="bank_sort")
+    st.caption(" · ".join(f"{label}: {count}" for label, count in store.experience_facets().items()))
+
+    min_years = min_years or None
+    filtered = bool(skills) or min_years is not None
+    offset, limit = paginate(store.count_profiles(skills, min_years) if filtered else store.count(), "bank")
+    df = bank_dataframe(store.search_profiles(skills, min_years, sort, offset, limit))
     df['LinkedIn'] = df['LinkedIn'].apply(lambda x: f'<a href="{x}" target="_blank">{x}</a>' if x else '')
     df['PDF Download'] = df.apply(lambda row: f'<a href="{row["PDF Path"]}" download="{row["Nome do Arquivo"]}">Baixar PDF</a>', axis=1)
     st.write(df.to_html(escape=False), unsafe_allow_html=True)
     
-    # Botão para baixar todos os currículos como ZIP
-    with io.BytesIO() as zip_buffer:
-        with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-            for _, row in df.iterrows():
-                pdf_path = row["PDF Path"]
-                with open(pdf_path, "rb") as f:
-                    pdf_data = f.read()
-                zip_file.writestr(f'{row["Nome do Arquivo"]}', pdf_data)
-        zip_buffer.seek(0)
-        st.download_button(
-            label="Baixar todo o banco de currículos",
-            data=zip_buffer,
-            file_name="banco_de_curriculos.zip",
-            mime="application/zip"
-        )
+    # Botão para baixar todos os currículos (ou apenas os filtrados) como ZIP
+    paths = store.profile_paths(skills, min_years) if filtered else store.paths()
+    entries = [(path, filename) for filename, path in paths.items()]
+    zip_download_button(
+        label="Baixar os currículos filtrados" if filtered else "Baixar todo o banco de currículos",
+        entries=entries,
+        file_name="banco_de_curriculos.zip",
+        key="bank_zip"
+    )
+
+def display_triage_groups(store, scored_results, key, weighted=False):
+    """
+    Exibe a página visível da triagem, agrupada pela pontuação.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    scored_results (list): Tuplas (pontuação, nome do arquivo).
+    key (str): Prefixo das chaves dos controles no Streamlit.
+    weighted (bool): Se a consulta usou pesos diferentes de 1.
+    """
+    offset, limit = paginate(len(scored_results), key)
+    for count, results in group_by_count(load_page(store, scored_results, offset, limit)).items():
+        st.write(score_label(count, weighted))
+        st.write(triage_dataframe(results).to_html(escape=False), unsafe_allow_html=True)
 
-def display_resume_triage(results):
+def display_resume_triage(store, index, semantic_index):
     """
     Exibe a triagem automática de currículos com base em palavras-chave ou descrição da vaga.
 
     Args:
-    results (list): Lista de resultados processados.
+    store (ResumeStore): Banco de currículos.
+    index (KeywordIndex): Índice invertido dos currículos.
+    semantic_index (SemanticIndex): Índice semântico dos currículos.
     """
     st.header("Triagem Automática de Currículos")
 
@@ -198,70 +381,29 @@ def display_resume_triage(results):
         triage_option = st.radio("Escolha a forma de triagem", ("Palavras-Chave", "Descrição da Vaga"), key="triage_option")
 
         if triage_option == "Palavras-Chave":
-            keywords = st.text_input("Adicione palavras-chave separadas por vírgulas", key="triage_keywords")
+            keywords = st.text_input("Adicione palavras-chave separadas por vírgulas", key="triage_keywords",
+                                     help=KEYWORD_QUERY_HELP)
+            min_years = st.number_input("Experiência mínima (anos)", min_value=0, value=0, step=1, key="triage_min_years")
             if keywords:
-                keywords = [keyword.strip().lower() for keyword in keywords.split(",")]
-                keywords_no_space = [keyword.replace(" ", "") for keyword in keywords]
-                filtered_results = []
-                for result in results:
-                    text = result["text"].lower()
-                    matched_keywords = set()
-                    for keyword in keywords + keywords_no_space:
-                        if keyword in text:
-                            matched_keywords.add(keyword)
-                    keyword_count = len(matched_keywords)
-                    if keyword_count > 0:
-                        filtered_results.append((keyword_count, result))
+                keywords, weights, required = parse_keyword_query(keywords)
+                weighted = any(weight != 1 for weight in weights.values())
+                filtered_results = score_resumes(store, index, keywords, weights=weights, required=required,
+                                                 min_years=min_years or None)
                 
                 if filtered_results:
                     st.write("Currículos encontrados com as palavras-chave fornecidas:")
-                    filtered_results.sort(reverse=True, key=lambda x: x[0])  # Ordenar por contagem de palavras-chave
-                    grouped_results = {}
-                    for count, result in filtered_results:
-                        if count not in grouped_results:
-                            grouped_results[count] = []
-                        grouped_results[count].append(result)
-                    
-                    triage_dataframes = []
-                    for count in sorted(grouped_results.keys(), reverse=True):
-                        group_df = pd.DataFrame([
-                            {
-                                "Nome do Arquivo": res["filename"],
-                                "Nome Completo": res["name"],
-                                "Telefone": ", ".join(res["phones"]),
-                                "Email": ", ".join(res["emails"]),
-                                "LinkedIn": ", ".join(res["linkedin_links"]),
-                                "Palavras-Chave Técnica": ", ".join(res["keywords"]),
-                                "Tempo Experiência": res["experience"],
-                                "PDF Download": res["path"]
-                            }
-                            for res in grouped_results[count]
-                        ])
-                        group_df['LinkedIn'] = group_df['LinkedIn'].apply(lambda x: f'<a href="{x}" target="_blank">{x}</a>' if x else '')
-                        triage_dataframes.append((count, group_df))
-                        st.write(f"Currículos com {count} palavras-chave correspondentes:")
-                        st.write(group_df.to_html(escape=False), unsafe_allow_html=True)
+                    display_triage_groups(store, filtered_results, "triage_keywords", weighted)
 
                     # Botão para baixar todos os resultados filtrados como ZIP
                     current_date = datetime.now().strftime("%Y-%m-%d")
                     zip_filename = f"triagem_inteligente_{job_name}_{current_date}.zip"
-                    with io.BytesIO() as zip_buffer:
-                        with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-                            for count, group_df in triage_dataframes:
-                                for _, row in group_df.iterrows():
-                                    pdf_path = row["PDF Download"]
-                                    with open(pdf_path, "rb") as f:
-                                        pdf_data = f.read()
-                                    zip_file.writestr(f"{count}_palavras_chave/{row['Nome do Arquivo']}", pdf_data)
-                            keywords_str = ", ".join(keywords)
-                            zip_file.writestr("palavras_chave.txt", keywords_str)
-                        zip_buffer.seek(0)
-                        st.download_button(
-                            label="Baixar todos os currículos triados",
-                            data=zip_buffer,
-                            file_name=zip_filename,
-                            mime="application/zip"
-                        )
+                    zip_download_button(
+                        label="Baixar todos os currículos triados",
+                        entries=zip_entries(store, filtered_results),
+                        file_name=zip_filename,
+                        key="triage_keywords_zip",
+                        extra_files={"palavras_chave.txt": ", ".join(keywords)}
+                    )
                 else:
                     st.write("Nenhum currículo encontrado com as palavras-chave fornecidas.")
 
@@ -269,71 +411,152 @@ def display_resume_triage(results):
             job_description_text = st.text_area("Insira a descrição da vaga", key="triage_job_description")
             if job_description_text:
                 job_keywords = extract_keywords_from_description(job_description_text)
-                job_keywords_no_space = [keyword.replace(" ", "") for keyword in job_keywords]
             
                 st.write("Palavras-chave técnicas extraídas da descrição da vaga:")
                 st.write(", ".join(job_keywords))
                 
-                if results:
+                if store.count():
+                    display_semantic_ranking(store, semantic_index, job_description_text, "triage")
                     st.write("Análise de compatibilidade dos currículos com a descrição da vaga:")
-                    compatibility_results = []
-                    
-                    for result in results:
-                        text = result["text"].lower()
-                        matched_keywords = set()
-                        for keyword in job_keywords + job_keywords_no_space:
-                            if keyword in text:
-                                matched_keywords.add(keyword)
-                        keyword_count = len(matched_keywords)
-                        compatibility_results.append((keyword_count, result))
+                    compatibility_results = score_resumes(store, index, job_keywords, include_unmatched=True)
                     
                     if compatibility_results:
-                        compatibility_results.sort(reverse=True, key=lambda x: x[0])  # Ordenar por contagem de palavras-chave
-                        grouped_results = {}
-                        for count, result in compatibility_results:
-                            if count not in grouped_results:
-                                grouped_results[count] = []
-                            grouped_results[count].append(result)
-                        
-                        triage_dataframes = []
-                        for count in sorted(grouped_results.keys(), reverse=True):
-                            group_df = pd.DataFrame([
-                                {
-                                    "Nome do Arquivo": res["filename"],
-                                    "Nome Completo": res["name"],
-                                    "Telefone": ", ".join(res["phones"]),
-                                    "Email": ", ".join(res["emails"]),
-                                    "LinkedIn": ", ".join(res["linkedin_links"]),
-                                    "Palavras-Chave Técnica": ", ".join(res["keywords"]),
-                                    "Tempo Experiência": res["experience"],
-                                    "PDF Download": res["path"]
-                                }
-                                for res in grouped_results[count]
-                            ])
-                            group_df['LinkedIn'] = group_df['LinkedIn'].apply(lambda x: f'<a href="{x}" target="_blank">{x}</a>' if x else '')
-                            triage_dataframes.append((count, group_df))
-                            st.write(f"Currículos com {count} palavras-chave correspondentes:")
-                            st.write(group_df.to_html(escape=False), unsafe_allow_html=True)
+                        display_triage_groups(store, compatibility_results, "triage_description")
 
                         # Botão para baixar todos os resultados filtrados como ZIP
                         current_date = datetime.now().strftime("%Y-%m-%d")
                         zip_filename = f"triagem_inteligente_{job_name}_{current_date}.zip"
-                        with io.BytesIO() as zip_buffer:
-                            with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-                                for count, group_df in triage_dataframes:
-                                    for _, row in group_df.iterrows():
-                                        pdf_path = row["PDF Download"]
-                                        with open(pdf_path, "rb") as f:
-                                            pdf_data = f.read()
-                                        zip_file.writestr(f"{count}_palavras_chave/{row['Nome do Arquivo']}", pdf_data)
-                                keywords_str = ", ".join(job_keywords)
-                                zip_file.writestr("palavras_chave.txt", keywords_str)
-                            zip_buffer.seek(0)
-                            st.download_button(
-                                label="Baixar todos os currículos triados",
-                                data=zip_buffer,
-                                file_name=zip_filename,
-                                mime="application/zip"
-                            )
+                        zip_download_button(
+                            label="Baixar todos os currículos triados",
+                            entries=zip_entries(store, compatibility_results),
+                            file_name=zip_filename,
+                            key="triage_description_zip",
+                            extra_files={"palavras_chave.txt": ", ".join(job_keywords)}
+                        )
                     else:
                         st.write("Nenhum currículo encontrado com a descrição da vaga fornecida.")
+
+def stage_summary(snapshot):
+    """
+    Resume os histogramas de latência e os erros por etapa.
+
+    Args:
+    snapshot (dict): Métricas retornadas por `MetricsRegistry.snapshot`.
+
+    Returns:
+    pd.DataFrame: Uma linha por etapa, da que consumiu mais tempo para a que consumiu menos.
+    """
+    errors = {}
+    for counter in snapshot["counters"]:
+        if counter["name"] == "stage_errors_total":
+            labels = {k: v for k, v in counter["labels"].items() if k != "error"}
+            key = tuple(sorted(labels.items()))
+            errors[key] = errors.get(key, 0) + counter["value"]
+    rows = []
+    for histogram in snapshot["histograms"]:
+        if histogram["name"] != "stage_seconds" or not histogram["count"]:
+            continue
+        labels = histogram["labels"]
+        rows.append({
+            "Etapa": " / ".join([labels["stage"], *(v for k, v in sorted(labels.items()) if k != "stage")]),
+            "Chamadas": histogram["count"],
+            "Tempo total (s)": round(histogram["sum"], 3),
+            "Média (ms)": round(1000 * histogram["sum"] / histogram["count"], 1),
+            "p50 (ms)": round(1000 * histogram["p50"], 1),
+            "p95 (ms)": round(1000 * histogram["p95"], 1),
+            "Erros": errors.get(tuple(sorted(labels.items())), 0),
+        })
+    df = pd.DataFrame(rows, columns=["Etapa", "Chamadas", "Tempo total (s)", "Média (ms)", "p50 (ms)", "p95 (ms)", "Erros"])
+    return df.sort_values("Tempo total (s)", ascending=False, ignore_index=True)
+
+def display_pending_stages(store):
+    """
+    Exibe os currículos com processamento incompleto e a situação de cada etapa,
+    com a opção de reprocessá-los imediatamente.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    """
+    st.subheader("Processamentos pendentes")
+    rows = {}
+    for filename, stage, status, error, attempts in store.stage_summary():
+        row = rows.setdefault(filename, {"Arquivo": filename, "Erro": ""})
+        row[stage] = "ok" if status == "ok" else f"erro ({attempts}x)"
+        if error:
+            row["Erro"] = error
+    if not rows:
+        st.write("Nenhum currículo com etapas pendentes.")
+        return
+    df = pd.DataFrame(list(rows.values()), columns=["Arquivo", *STAGES, "Erro"]).fillna("pendente")
+    st.dataframe(df)
+    if st.button("Reprocessar agora", key="retry_pending"):
+        with st.spinner("Reprocessando as etapas pendentes..."):
+            completed, failures = retry_pending(store, max_attempts=None)
+        st.success(f"{completed} currículos concluídos, {failures} ainda com falha.")
+
+def display_diagnostics(store):
+    """
+    Exibe as métricas do processo: tempo por etapa, chamadas remotas, situação
+    dos limites de requisições por serviço, taxa de acerto dos caches e volume
+    enviado ao modelo de linguagem, com exportação em formato Prometheus ou
+    JSON, e os currículos com etapas pendentes.
+
+    Args:
+    store (ResumeStore): Banco de currículos.
+    """
+    st.header("Diagnóstico")
+    display_pending_stages(store)
+    snapshot = metrics.snapshot()
+    counters = snapshot["counters"]
+
+    st.subheader("Tempo por etapa")
+    st.dataframe(stage_summary(snapshot))
+
+    st.subheader("Chamadas remotas")
+    calls = {c["labels"]["service"]: c["value"] for c in counters if c["name"] == "remote_calls_total"}
+    per_resume = next((h for h in snapshot["histograms"] if h["name"] == "remote_calls_per_resume"), None)
+    if per_resume and per_resume["count"]:
+        st.write(f"Média de {per_resume['sum'] / per_resume['count']:.1f} chamadas remotas por currículo "
+                 f"({per_resume['count']} currículos processados).")
+    st.dataframe(pd.DataFrame(sorted(calls.items()), columns=["Serviço", "Chamadas"]))
+
+    st.subheader("Limites de requisições")
+    throttled = {}
+    for counter in counters:
+        if counter["name"] == "scheduler_throttled_total":
+            service = counter["labels"]["service"]
+            throttled[service] = throttled.get(service, 0) + counter["value"]
+    status = pd.DataFrame([dict(scheduler.status(), recusas=throttled.get(service, 0))
+                           for service, scheduler in schedulers.items()])
+    st.dataframe(status.rename(columns={
+        "servico": "Serviço", "limite_simultaneas": "Limite de simultâneas", "em_andamento": "Em andamento",
+        "interativas_em_espera": "Interativas em espera", "lote_em_espera": "Lote em espera",
+        "fichas": "Fichas", "recusas": "Recusas (429/5xx)",
+    }))
+
+    st.subheader("Caches")
+    caches = {}
+    for counter in counters:
+        if counter["name"] == "cache_requests_total":
+            hits_misses = caches.setdefault(counter["labels"]["cache"], {"hit": 0, "miss": 0})
+            hits_misses[counter["labels"]["result"]] += counter["value"]
+    st.dataframe(pd.DataFrame(
+        [(cache, c["hit"], c["miss"], f"{c['hit'] / (c['hit'] + c['miss']):.0%}") for cache, c in sorted(caches.items())],
+        columns=["Cache", "Acertos", "Faltas", "Taxa de acerto"],
+    ))
+
+    st.subheader("Modelo de linguagem")
+    usage = {}
+    for counter in counters:
+        if counter["name"] in ("llm_characters_total", "llm_tokens_total"):
+            unit = "caracteres" if counter["name"] == "llm_characters_total" else "tokens"
+            row = usage.setdefault(counter["labels"]["prompt"], {})
+            row[f"{unit} ({counter['labels']['direction']})"] = counter["value"]
+    st.dataframe(pd.DataFrame.from_dict(usage, orient="index").fillna(0))
+
+    col1, col2, col3 = st.columns(3)
+    col1.download_button("Exportar (Prometheus)", metrics.to_prometheus(), file_name="metricas.prom", mime="text/plain")
+    col2.download_button("Exportar (JSON)", metrics.to_json(), file_name="metricas.json", mime="application/json")
+    if col3.button("Zerar métricas"):
+        metrics.reset()
+        st.rerun()